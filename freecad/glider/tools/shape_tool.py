@@ -297,9 +297,10 @@ class ShapeTool(BaseTool):
             p = self.back_cpc.control_points[-1].points
             p[0][0] = new_value
             self.back_cpc.control_points[-1].points = p
-            self.parametric_glider.shape.rib_distribution._data[:, 0] *= (
-                new_value / old_value
-            )
+            rib_distribution = self.parametric_glider.shape.rib_distribution
+            data = rib_distribution.data.copy()
+            data[:, 0] *= new_value / old_value
+            rib_distribution.data = data
             self.cell_dist_cpc.control_pos = (
                 self.parametric_glider.shape.rib_dist_controlpoints
             )
@@ -312,9 +313,10 @@ class ShapeTool(BaseTool):
             p = self.front_cpc.control_points[-1].points
             p[0][0] = new_value
             self.front_cpc.control_points[-1].points = p
-            self.parametric_glider.shape.rib_distribution._data[:, 0] *= (
-                new_value / old_value
-            )
+            rib_distribution = self.parametric_glider.shape.rib_distribution
+            data = rib_distribution.data.copy()
+            data[:, 0] *= new_value / old_value
+            rib_distribution.data = data
             self.cell_dist_cpc.control_pos = (
                 self.parametric_glider.shape.rib_dist_controlpoints
             )
@@ -21,6 +21,7 @@ from __future__ import division
 from openglider.airfoil.profile_2d import Profile2D
 from openglider.airfoil.profile_3d import Profile3D
 from openglider.airfoil.parametric import BezierProfile2D
+from openglider.airfoil.library import AirfoilLibrary
 
 
 def get_x_value(x_value_list, x):
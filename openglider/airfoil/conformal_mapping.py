@@ -15,10 +15,8 @@ class JoukowskyAirfoil(object):
     def circle(self, num=100):
         """A circle with center midpoint and passing 0j + 1"""
 
-        def circle_val(phi):
-            return self.midpoint + self.radius * np.e ** ((phi - self.beta) * 1j)
-
-        return np.array([circle_val(phi) for phi in np.linspace(0, 2 * np.pi, num)])
+        phi = np.linspace(0, 2 * np.pi, num)
+        return self.midpoint + self.radius * np.e ** ((phi - self.beta) * 1j)
 
     @property
     def radius(self):
@@ -49,7 +47,7 @@ class JoukowskyAirfoil(object):
 
     def coordinates(self, num=100):
         """maps the z-circle to the zeta-plane which results in a joukowsky airfoil"""
-        return np.array(list(map(self.zeta, self.circle(num))))
+        return self.zeta(self.circle(num))
 
     def gamma(self, alpha):
         """return the strength of the circulation to satisfy the kutta-condition
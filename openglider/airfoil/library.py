@@ -0,0 +1,148 @@
+"""
+Binary store for a collection of airfoils.
+
+A library is a directory holding ``coordinates.npy`` (the points of all
+airfoils, stacked) and ``index.json`` (names, offsets and precomputed
+thickness/camber). The coordinates are loaded memory-mapped, so opening a
+library is cheap and airfoils are only read from disk when used.
+"""
+from __future__ import annotations
+import glob
+import json
+import logging
+import os
+import shutil
+import uuid
+
+import numpy as np
+
+from openglider.airfoil.profile_2d import Profile2D
+
+logger = logging.getLogger(__name__)
+
+
+class AirfoilLibrary(object):
+    """
+    Read-only airfoil collection. Airfoils are returned as Profile2D objects
+    sharing the (read-only) memory-mapped data, use .copy() to modify them.
+    """
+
+    index_file = "index.json"
+    data_file = "coordinates.npy"
+
+    def __init__(self, path):
+        self.path = os.path.abspath(path)
+        with open(os.path.join(self.path, self.index_file)) as index_file:
+            index = json.load(index_file)
+
+        self.names = index["names"]
+        self.titles = index["titles"]
+        self.offsets = np.array(index["offsets"], dtype=int)
+        self.thickness = np.array(index["thickness"], dtype=float)
+        self.camber = np.array(index["camber"], dtype=float)
+        self.data = np.load(
+            os.path.join(self.path, self.data_file), mmap_mode="r", allow_pickle=False
+        )
+        self._positions = {name: i for i, name in enumerate(self.names)}
+
+    def __repr__(self):
+        return f"<AirfoilLibrary {self.path} ({len(self)} airfoils)>"
+
+    def __len__(self):
+        return len(self.names)
+
+    def __iter__(self):
+        return iter(self.names)
+
+    def __contains__(self, name):
+        return name in self._positions
+
+    def __getitem__(self, name):
+        """
+        Get an airfoil by name or position
+        """
+        position = name if isinstance(name, int) else self._positions[name]
+        return Profile2D(self.get_data(position), self.titles[position], copy=False)
+
+    def get_data(self, position):
+        """
+        Coordinates of an airfoil (a read-only view of the memory-map)
+        """
+        return self.data[self.offsets[position] : self.offsets[position + 1]]
+
+    def find(self, thickness=None, camber=None):
+        """
+        Names of all airfoils within the given (min, max) ranges, p.e.:
+        library.find(thickness=(0.14, 0.16))
+        """
+        matches = np.ones(len(self), dtype=bool)
+        for values, value_range in ((self.thickness, thickness), (self.camber, camber)):
+            if value_range is not None:
+                lower, upper = value_range
+                matches &= (lower <= values) & (values <= upper)
+
+        return [self.names[i] for i in np.flatnonzero(matches)]
+
+    @classmethod
+    def build(cls, path, airfoils):
+        """
+        Store airfoils in a new library (an existing one is replaced)
+        :param path: directory of the library
+        :param airfoils: dict name -> Profile2D or list of Profile2D (keyed by their names)
+        """
+        if not isinstance(airfoils, dict):
+            airfoils = {airfoil.name: airfoil for airfoil in airfoils}
+
+        names = list(airfoils)
+        profiles = [airfoils[name] for name in names]
+        lengths = [len(profile) for profile in profiles]
+        index = {
+            "names": names,
+            "titles": [profile.name or name for name, profile in zip(names, profiles)],
+            "offsets": np.concatenate([[0], np.cumsum(lengths)]).tolist(),
+            "thickness": [cls._get_property(profile, "thickness") for profile in profiles],
+            "camber": [cls._get_property(profile, "camber") for profile in profiles],
+        }
+        if profiles:
+            data = np.concatenate([profile.data for profile in profiles])
+        else:
+            data = np.zeros((0, 2))
+
+        path = os.path.abspath(path)
+        tmp_dir = f"{path}.tmp-{uuid.uuid4().hex}"
+        os.makedirs(tmp_dir)
+        np.save(os.path.join(tmp_dir, cls.data_file), np.asarray(data, dtype=float))
+        with open(os.path.join(tmp_dir, cls.index_file), "w") as index_file:
+            json.dump(index, index_file)
+
+        if os.path.isdir(path):
+            shutil.rmtree(path)
+        os.rename(tmp_dir, path)
+
+        return cls(path)
+
+    @classmethod
+    def from_dat_directory(cls, path, directory, pattern="*.dat"):
+        """
+        Convert a directory of '.dat' files into a library (named by the file names)
+        """
+        airfoils = {}
+        for dat_path in sorted(glob.glob(os.path.join(directory, pattern))):
+            name = os.path.splitext(os.path.basename(dat_path))[0]
+            try:
+                airfoils[name] = Profile2D.import_from_dat(dat_path)
+            except Exception:
+                logger.warning(f"skipping unreadable airfoil {dat_path}", exc_info=True)
+
+        return cls.build(path, airfoils)
+
+    @staticmethod
+    def _get_property(profile, attribute):
+        # degenerate profiles (too few points, no nose) have no thickness/camber
+        try:
+            return float(getattr(profile, attribute))
+        except (ValueError, IndexError, ArithmeticError):
+            logger.warning(
+                f"can't compute the {attribute} of {profile.name}", exc_info=True
+            )
+            return float("nan")
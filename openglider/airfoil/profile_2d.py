@@ -19,13 +19,12 @@
 # along with OpenGlider.  If not, see <http://www.gnu.org/licenses/>.
 import os
 import re
-import math
 import numpy as np
 import tempfile
 import shutil
 import logging
 
-from openglider.utils.cache import HashedList
+from openglider.utils.cache import cached_property
 from openglider.utils.distribution import Distribution
 from openglider.vector.functions import norm_squared
 from openglider.vector.polygon import Polygon2D
@@ -39,15 +38,56 @@ class Profile2D(Polygon2D):
     Profile2D: 2 Dimensional Standard airfoil representative
     """
 
-    def __init__(self, data, name=None):
+    def __init__(self, data, name=None, copy=True):
         self.noseindex = None
-        super(Profile2D, self).__init__(data, name)
+        super(Profile2D, self).__init__(data, name, copy=copy)
 
     def __imul__(self, other):
         fakt = np.array([1, float(other)])
         return super(Profile2D, self).__imul__(fakt)
 
+    @cached_property("self")
+    def _x_lookup(self):
+        """
+        x-values with the upper side (descending) and the lower side (ascending)
+        prepared for a binary search, None if the lower side is not ascending
+        """
+        x_values = np.ascontiguousarray(self.data[:, 0], dtype=float)
+        upper = -x_values[1 : self.noseindex + 1]
+        lower = x_values[self.noseindex : -1]
+        if np.any(lower[1:] < lower[:-1]):
+            return None
+        return x_values, upper, lower
+
     def __call__(self, xval):
+        """
+        Get the (fractional) index for an x-value or an array of x-values (<0: upper side)
+        """
+        lookup = self._x_lookup
+        if lookup is None:
+            if np.ndim(xval) > 0:
+                return np.array([self._call_unsorted(x) for x in np.ravel(xval)]).reshape(
+                    np.shape(xval)
+                )
+            return self._call_unsorted(xval)
+
+        x_values, upper, lower = lookup
+        xval = np.asarray(xval, dtype=float)
+        x_abs = np.abs(xval)
+
+        # UPPER: last point with x >= -xval (starting at 1)
+        i_upper = np.searchsorted(upper, -x_abs, side="right")
+        i_upper = np.minimum(i_upper, self.noseindex - 1)
+        # LOWER: last point with x <= xval (up to len - 2)
+        i_lower = np.searchsorted(lower, xval, side="right") + self.noseindex - 1
+        i_lower = np.where(i_lower < self.noseindex, 1, i_lower)
+        # NOSE
+        i = np.where(xval < 0, i_upper, np.where(xval == 0, self.noseindex - 1, i_lower))
+
+        k = -(x_values[i] - x_abs) / (x_values[i + 1] - x_values[i])
+        return (i + k)[()]
+
+    def _call_unsorted(self, xval):
         xval = float(xval)
         if xval < 0.0:  # LOWER
             i = 1
@@ -67,7 +107,17 @@ class Profile2D(Polygon2D):
         return i + k
 
     def align(self, p):
-        """Align a point (x, y) on the airfoil. x: (0,1), y: (-1,1)"""
+        """
+        Align a point (x, y) or an array of points on the airfoil. x: (0,1), y: (-1,1)
+        """
+        if np.ndim(p) > 1:
+            p = np.asarray(p, dtype=float)
+            x, y = p[:, 0], p[:, 1]
+            upper = self[self(-x)]
+            lower = self[self(x)]
+
+            return lower + (upper - lower) * ((y + 1) / 2)[:, np.newaxis]
+
         x, y = p
         upper = self[self(-x)]
         lower = self[self(x)]
@@ -76,9 +126,17 @@ class Profile2D(Polygon2D):
 
     def profilepoint(self, xval, h=-1.0):
         """
-        Get airfoil Point for x-value (<0:upper side)
+        Get airfoil Point for x-value (<0:upper side) or an array of x-values
         optional: height (-1:lower,1:upper)
         """
+        if np.ndim(xval) > 0:
+            xval = np.asarray(xval, dtype=float)
+            p1 = self[self(xval)]
+            if np.all(np.asarray(h) == -1):
+                return p1
+            p2 = self[self(-xval)]
+            return p1 + ((1.0 + np.asarray(h)) / 2)[..., np.newaxis] * (p2 - p1)
+
         if not h == -1:  # middlepoint
             p1 = self[self(xval)]
             p2 = self[self(-xval)]
@@ -101,19 +159,18 @@ class Profile2D(Polygon2D):
         sin_sq = diff.dot([0, -1]) / norm_squared(diff)  # Angle: a.b=|a|*|b|*sin(alpha)
         cos_sq = diff.dot([1, 0]) / norm_squared(diff)
         matrix = np.array([[cos_sq, -sin_sq], [sin_sq, cos_sq]])  # de-rotate and scale
-        data = np.array([matrix.dot(i - nose) for i in self.data])
+        data = (self.data - nose).dot(matrix.T)
         data[-1] = data[0]
         self.data = data
         return self
 
-    @HashedList.data.setter
-    def data(self, data):
-        HashedList.data.fset(self, data)
+    def set_data(self, data, copy=True):
+        super(Profile2D, self).set_data(data, copy=copy)
         if data is not None:
-            i = 0
-            while data[i + 1][0] < data[i][0] and i < len(data):
-                i += 1
-            self.noseindex = i
+            x_values = self._data[:, 0]
+            # first point with a following point further back
+            rising = np.flatnonzero(~(x_values[1:] < x_values[:-1]))
+            self.noseindex = int(rising[0]) if len(rising) else len(x_values) - 1
 
     def get_data(self, negative_x=False):
         if not negative_x:
@@ -134,15 +191,27 @@ class Profile2D(Polygon2D):
         return first
 
     def __iadd__(self, other):
-        for i, point in enumerate(self.data):
-            if i > self.noseindex:
-                x = point[0]
-            else:
-                x = -point[0]
-
-            point[1] += other[other(x)][1]
+        data = self.data.copy()
+        data[:, 1] += other.profilepoint(self._signed_x_values())[:, 1]
+        self.data = data
         return self
 
+    def mix(self, other, factor):
+        """
+        Mix 2 Profiles: (1-factor) * self + factor * other, where other is
+        resampled at the x-values of self (per side, with the vectorized
+        binary search of profilepoint)
+        """
+        y_values = other.profilepoint(self._signed_x_values())[:, 1]
+        data = self.data * [1, 1 - factor] + np.outer(y_values, [0, factor])
+        return Profile2D(data, name=self.name, copy=False)
+
+    def _signed_x_values(self):
+        # upper side (including the nose) negative
+        x_values = self.data[:, 0].copy()
+        x_values[: self.noseindex + 1] *= -1
+        return x_values
+
     _re_number = r"([-+]?\d*\.\d*(?:[eE][+-]?\d+)?|\d+)"
     _re_coord_line = re.compile(rf"\s*{_re_number}\s+{_re_number}\s*")
 
@@ -187,58 +256,66 @@ class Profile2D(Polygon2D):
     @classmethod
     def compute_naca(cls, naca=1234, numpoints=100):
         """Compute and return a four-digit naca-airfoil"""
+        data = cls.compute_naca_array([naca], numpoints)[0]
+        return cls(data, name="NACA_" + str(naca), copy=False)
+
+    @staticmethod
+    def compute_naca_array(naca, numpoints=100):
+        """
+        Compute the coordinates of several four-digit naca-airfoils at once
+        :param naca: list of naca-numbers (N)
+        :return: array (N x 2*numpoints-1 x 2)
+        """
         # See: http://people.clarkson.edu/~pmarzocc/AE429/The%20NACA%20airfoil%20series.pdf
         # and: http://airfoiltools.com/airfoil/naca4digit
-        m = int(naca / 1000) * 0.01  # Maximum Camber Position
-        p = int((naca % 1000) / 100) * 0.1  # second digit: Maximum Thickness position
+        naca = np.asarray(naca)[:, np.newaxis]
+        m = (naca // 1000) * 0.01  # Maximum Camber Position
+        p = ((naca % 1000) // 100) * 0.1  # second digit: Maximum Thickness position
         t = (naca % 100) * 0.01  # last two digits: Maximum Thickness(%)
-        x_values = [
-            1 - math.sin((x * 1.0 / (numpoints - 1)) * math.pi / 2)
-            for x in range(numpoints)
-        ]
+        x = 1 - np.sin(np.arange(numpoints) / (numpoints - 1) * np.pi / 2)
         # x_values = self.cos_distribution(numpoints)
 
-        upper = []
-        lower = []
         a0 = 0.2969
         a1 = -0.126
         a2 = -0.3516
         a3 = 0.2843
         a4 = -0.1015
 
-        for x in x_values:
-            if x < p:
-                mean_camber = m / (p**2) * (2 * p * x - x**2)
-                gradient = 2 * m / (p**2) * (p - x)
-            else:
-                mean_camber = m / ((1 - p) ** 2) * ((1 - 2 * p) + 2 * p * x - x**2)
-                gradient = 2 * m / (1 - p**2) * (p - x)
-
-            thickness_this = (
-                t
-                / 0.2
-                * (a0 * math.sqrt(x) + a1 * x + a2 * x**2 + a3 * x**3 + a4 * x**4)
-            )
-            # theta = math.atan(gradient)
-            costheta = (1 + gradient**2) ** (-0.5)
-            sintheta = gradient * costheta
-            upper.append(
-                [x - thickness_this * sintheta, mean_camber + thickness_this * costheta]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            front = x < p
+            mean_camber = np.where(
+                front,
+                m / (p**2) * (2 * p * x - x**2),
+                m / ((1 - p) ** 2) * ((1 - 2 * p) + 2 * p * x - x**2),
             )
-            lower.append(
-                [x + thickness_this * sintheta, mean_camber - thickness_this * costheta]
+            gradient = np.where(
+                front, 2 * m / (p**2) * (p - x), 2 * m / (1 - p**2) * (p - x)
             )
-        return cls(upper + lower[::-1][1:], name="NACA_" + str(naca))
+
+        thickness = (
+            t / 0.2 * (a0 * np.sqrt(x) + a1 * x + a2 * x**2 + a3 * x**3 + a4 * x**4)
+        )
+        # theta = math.atan(gradient)
+        costheta = (1 + gradient**2) ** (-0.5)
+        sintheta = gradient * costheta
+
+        upper = np.stack(
+            [x - thickness * sintheta, mean_camber + thickness * costheta], axis=-1
+        )
+        lower = np.stack(
+            [x + thickness * sintheta, mean_camber - thickness * costheta], axis=-1
+        )
+        return np.concatenate([upper, lower[:, -2::-1]], axis=1)
 
     @classmethod
     def compute_joukowsky(cls, m=-0.1 + 0.1j, numpoints=100):
         from openglider.airfoil.conformal_mapping import JoukowskyAirfoil
 
         airfoil = JoukowskyAirfoil(m)
-        profile = [[c.real, c.imag] for c in airfoil.coordinates(numpoints)]
+        coordinates = airfoil.coordinates(numpoints)
+        profile = np.stack([coordinates.real, coordinates.imag], axis=1)
 
         # find the smallest xvalue to reset the nose
-        x = np.array([i[0] for i in profile])
         profile = cls(profile, "joukowsky_" + str(m))
         profile.normalize()
         profile.numpoints = numpoints
@@ -249,7 +326,8 @@ class Profile2D(Polygon2D):
         from openglider.airfoil.conformal_mapping import VanDeVoorenAirfoil
 
         airfoil = VanDeVoorenAirfoil(tau=tau, epsilon=epsilon)
-        profile = [[c.real, c.imag] for c in airfoil.coordinates(numpoints)]
+        coordinates = airfoil.coordinates(numpoints)
+        profile = np.stack([coordinates.real, coordinates.imag], axis=1)
 
         # find the smallest xvalue to reset the nose
         profile = cls(
@@ -264,10 +342,10 @@ class Profile2D(Polygon2D):
         from openglider.airfoil.conformal_mapping import TrefftzKuttaAirfoil
 
         airfoil = TrefftzKuttaAirfoil(midpoint=m, tau=tau)
-        profile = [[c.real, c.imag] for c in airfoil.coordinates(numpoints)]
+        coordinates = airfoil.coordinates(numpoints)
+        profile = np.stack([coordinates.real, coordinates.imag], axis=1)
 
         # find the smallest xvalue to reset the nose
-        x = np.array([i[0] for i in profile])
         profile = cls(profile, "TrefftzKuttaAirfoil_m=" + str(m) + "_tau=" + str(tau))
         profile.normalize()
         profile.numpoints = numpoints
@@ -277,16 +355,16 @@ class Profile2D(Polygon2D):
     @property
     def x_values(self):
         """Get XValues of airfoil. upper side neg, lower positive"""
-        i = self.noseindex
-        return [-vector[0] for vector in self.data[:i]] + [
-            vector[0] for vector in self.data[i:]
-        ]
+        x_values = self.data[:, 0].copy()
+        x_values[: self.noseindex] *= -1
+        return x_values.tolist()
 
     @x_values.setter
     def x_values(self, xval):
         """Set X-Values of airfoil to defined points."""
-        data = [(abs(x), self[self(x)][1]) for x in xval]
-        self.data = np.array(data)
+        xval = np.asarray(xval, dtype=float)
+        y_values = self[self(xval)][:, 1]
+        self.data = np.stack([np.abs(xval), y_values], axis=1)
 
     @property
     def numpoints(self):
@@ -301,8 +379,8 @@ class Profile2D(Polygon2D):
     @property
     def thickness(self):
         """return the maximum sickness (Sic!) of an airfoil"""
-        xvals = sorted(set(map(abs, self.x_values)))
-        return max([self[self(-i)][1] - self[self(i)][1] for i in xvals])
+        xvals = np.unique(np.abs(self.x_values))
+        return np.max(self.profilepoint(-xvals)[:, 1] - self.profilepoint(xvals)[:, 1])
 
     @thickness.setter
     def thickness(self, newthick):
@@ -315,8 +393,8 @@ class Profile2D(Polygon2D):
 
     @property
     def camber_line(self):
-        xvals = sorted(set(map(abs, self.x_values)))
-        return np.array([self.profilepoint(i, 0.0) for i in xvals])
+        xvals = np.unique(np.abs(self.x_values))
+        return self.profilepoint(xvals, 0.0)
 
     # @cached_property('self')
     @property
@@ -375,9 +453,9 @@ class Profile2D(Polygon2D):
         ik = self(pos)
         diff = ik % 1.0
         if diff < 0.5:
-            self.data[int(ik)] = self.profilepoint(pos)
+            self[int(ik)] = self.profilepoint(pos)
         else:
-            self.data[int(ik) + 1] = self.profilepoint(pos)
+            self[int(ik) + 1] = self.profilepoint(pos)
 
     def nearest_x_value(self, x):
         min_x_value = None
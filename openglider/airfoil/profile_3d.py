@@ -22,38 +22,41 @@ import numpy as np
 
 from openglider.utils.cache import cached_property
 from openglider.vector import Plane
-from openglider.vector.functions import norm, normalize
+from openglider.vector.functions import normalize
 from openglider.vector.polyline import PolyLine
 from openglider.airfoil import Profile2D
 
 
+def _normalize_rows(vectors):
+    """
+    normalize an array of vectors (rows)
+    """
+    lengths = np.linalg.norm(vectors, axis=1)
+    if not np.all(lengths > 0):
+        raise ValueError("Cannot normalize a vector of length 0")
+    return vectors / lengths[:, np.newaxis]
+
+
 class Profile3D(PolyLine):
     @cached_property("self")
     def noseindex(self):
-        p0 = self.data[0]
-        max_dist = 0
-        noseindex = 0
-        for i, p1 in enumerate(self.data):
-            diff = norm(p1 - p0)
-            if diff > max_dist:
-                noseindex = i
-                max_dist = diff
-        return noseindex
+        # the point with the largest distance to the first point
+        distances = np.linalg.norm(self.data - self.data[0], axis=1)
+        return int(np.argmax(distances))
 
     @cached_property("self")
     def projection_layer(self):
         """
         Projection Layer of profile_3d
         """
-        p1 = self.data[0]
-        diff = [p - p1 for p in self.data]
+        diff = self.data - self.data[0]
 
         xvect = normalize(-diff[self.noseindex])
-        yvect = np.array([0, 0, 0])
 
-        for i in range(len(diff)):
-            sign = 1 - 2 * (i > self.noseindex)
-            yvect = yvect + sign * (diff[i] - xvect * xvect.dot(diff[i]))
+        # upper side (up to the nose) positive, lower side negative
+        sign = np.ones(len(diff))
+        sign[self.noseindex + 1 :] = -1
+        yvect = sign.dot(diff - np.outer(diff.dot(xvect), xvect))
 
         # prev
         try:
@@ -68,44 +71,48 @@ class Profile3D(PolyLine):
     def flatten(self):
         """Flatten the airfoil and return a 2d-Representative"""
         layer = self.projection_layer
+        diff = self.data - layer.p0
         return Profile2D(
-            [layer.projection(p) for p in self.data],
+            np.stack([diff.dot(layer.v1), diff.dot(layer.v2)], axis=1),
             name=self.name or "profile" + "_flattened",
         )
 
     @cached_property("self")
     def normvectors(self):
+        """
+        Normvectors (N, 3) of the profile within the projection layer
+        """
         layer = self.projection_layer
         profnorm = layer.normvector
-        get_normvector = lambda x: normalize(np.cross(x, profnorm))
 
-        vectors = [get_normvector(self.data[1] - self.data[0])]
-        for i in range(1, len(self.data) - 1):
-            vectors.append(
-                get_normvector(
-                    normalize(self.data[i + 1] - self.data[i])
-                    + normalize(self.data[i] - self.data[i - 1])
-                )
-            )
-        vectors.append(get_normvector(self.data[-1] - self.data[-2]))
+        segments = np.diff(self.data, axis=0)
+        directions = np.empty_like(self.data)
+        directions[0] = segments[0]
+        directions[-1] = segments[-1]
+        if len(segments) > 1:
+            unit_segments = _normalize_rows(segments)
+            directions[1:-1] = unit_segments[1:] + unit_segments[:-1]
 
-        return vectors
+        return _normalize_rows(np.cross(directions, profnorm))
 
-    @property
+    @cached_property("self")
     def tangents(self):
-        second = self.data[0]
-        third = self.data[1]
-        tangents = [normalize(third - second)]
-        for element in self.data[2:]:
-            first = second
-            second = third
-            third = element
-            tangent = np.array([0, 0, 0])
-            for vec in [third - second, second - first]:
-                try:
-                    tangent = tangent + normalize(vec)
-                except ValueError:  # zero-length vector
-                    pass
-            tangents.append(tangent)
-        tangents.append(normalize(third - second))
+        """
+        Tangents (N, 3): normalized at the ends, sum of the adjacent
+        segment directions in between (zero-length segments are skipped)
+        """
+        segments = np.diff(self.data, axis=0)
+        lengths = np.linalg.norm(segments, axis=1)
+        if not (lengths[0] > 0 and lengths[-1] > 0):
+            raise ValueError("Cannot normalize a vector of length 0")
+
+        unit_segments = np.zeros_like(segments)
+        np.divide(
+            segments, lengths[:, np.newaxis], out=unit_segments, where=lengths[:, np.newaxis] > 0
+        )
+
+        tangents = np.empty_like(self.data)
+        tangents[0] = unit_segments[0]
+        tangents[-1] = unit_segments[-1]
+        tangents[1:-1] = unit_segments[1:] + unit_segments[:-1]
         return tangents
@@ -1,4 +1,5 @@
 import getpass
+import os
 import platform
 
 from openglider.utils import Config
@@ -7,6 +8,14 @@ from openglider.utils import Config
 class GlobalConfig(Config):
     asinc_interpolation_points = 2000
     caching = True
+    # limits for all cached properties and function caches together (None -> unlimited)
+    cache_max_entries = None
+    cache_max_bytes = 2**30
+    # persistent cache for expensive results (None -> disabled)
+    disk_cache_path = os.environ.get("OPENGLIDER_DISK_CACHE")
+    disk_cache_max_bytes = 2**30
+    # worker processes for the cell-parallel flattening (1 -> serial, None -> all cores)
+    cell_workers = 1
     debug = False
     json_allowed_modules = [r"openglider\..*"]
     json_forbidden_modules = [r".*eval", r".*subprocess.*"]
@@ -23,43 +23,46 @@ import numpy as np
 from numpy import interp
 
 import openglider
+from openglider.utils.cache import CachedObject
 from openglider.vector.spline import BSpline
 from openglider.vector.interpolate import Interpolation
 
 
 class ArcSinc:
+    """
+    Inverse of sinc(phi)=sin(phi)/phi for phi in [0, pi], tabulated on
+    a uniform phi-grid and evaluated with np.interp (values or arrays).
+    """
+
     def __init__(self):
         self.start = 0.0
         self.end = np.pi
-        self.arsinc = None
+        self.x_values = None
+        self.phi_values = None
 
     def __call__(self, val):
-        if self.arsinc is None:
+        if self.x_values is None:
             self.interpolate(openglider.config["asinc_interpolation_points"])
-        return self.arsinc(val)
+        return interp(val, self.x_values, self.phi_values)
 
     def interpolate(self, numpoints):
-        data = []
-
-        for i in range(numpoints + 1):
-            phi = self.end + (i * 1.0 / numpoints) * (
-                self.start - self.end
-            )  # reverse for interpolation (increasing x_values)
-            data.append([np.sinc(phi / np.pi), phi])
-
-        self.arsinc = Interpolation(data)
+        # reverse for interpolation (increasing x_values)
+        phi = np.linspace(self.end, self.start, numpoints + 1)
+        self.x_values = np.sinc(phi / np.pi)
+        self.phi_values = phi
 
     @property
     def numpoints(self):
-        return len(self.arsinc.data)
+        return len(self.x_values)
 
     @numpoints.setter
     def numpoints(self, numpoints):
         self.interpolate(numpoints)
 
 
-class Ballooning(object):
+class Ballooning(CachedObject):
     arcsinc = ArcSinc()
+    hashlist = ("upper", "lower")
 
     def __init__(self, f_upper, f_lower):
         self.upper = f_upper
@@ -69,7 +72,18 @@ class Ballooning(object):
         return {"f_upper": self.upper, "f_lower": self.lower}
 
     def __getitem__(self, xval):
-        """Get Ballooning Value (%) for a certain XValue"""
+        """Get Ballooning Value (%) for a certain XValue or an array of XValues"""
+        if np.ndim(xval) > 0:
+            xval = np.asarray(xval, dtype=float)
+            if not np.all((-1 <= xval) & (xval <= 1)):
+                raise ValueError("Values {} not between -1 and 1".format(xval))
+
+            upper = xval < 0
+            values = np.empty(xval.shape)
+            values[upper] = self.upper(-xval[upper])
+            values[~upper] = self.lower(xval[~upper])
+            return values
+
         if -1 <= xval < 0:
             # return self.upper.xpoint(-xval)[1]
             return self.upper(-xval)
@@ -86,7 +100,7 @@ class Ballooning(object):
     def get_tension_factor(self, xval):
         """Get the tension due to ballooning"""
         value = 2.0 * np.tan(self(xval))
-        if 0.0 in value:
+        if np.any(value == 0.0):
             return value
         else:
             return 1.0 / value
@@ -103,10 +117,8 @@ class Ballooning(object):
         return Ballooning(Interpolation(upper), Interpolation(lower))
 
     def __imul__(self, val):
-        for point in self.upper.data:
-            point[1] *= val
-        for point in self.lower.data:
-            point[1] *= val
+        self.upper.data = self.upper.data * [1, val]
+        self.lower.data = self.lower.data * [1, val]
         return self
 
     def __mul__(self, value):
@@ -119,15 +131,15 @@ class Ballooning(object):
         return copy.deepcopy(self)
 
     @classmethod
-    def phi(cls, *baloon):
+    def phi(cls, baloon):
         """
-        Return the angle of the piece of cake.
+        Return the angle of the piece of cake (for a value or an array).
         b/l=R*phi/(R*Sin(phi)) -> Phi=arsinc(l/b)
         """
         return cls.arcsinc(baloon)
 
     def mapx(self, xvals):
-        return [self[i] for i in xvals]
+        return self[np.asarray(xvals, dtype=float)]
 
     @property
     def amount_maximal(self):
@@ -260,6 +272,8 @@ class BallooningBezier(Ballooning):
 
 
 class BallooningBezierNeu(Ballooning):
+    hashlist = ("upper", "lower", "spline_curve")
+
     def __init__(self, spline, name="ballooning_neu"):
         self.spline_curve = BSpline(spline)
         self.name = name
@@ -270,8 +284,8 @@ class BallooningBezierNeu(Ballooning):
         return {"spline": self.spline_curve.controlpoints}
 
     def __getitem__(self, xval):
-        """Get Ballooning Value (%) for a certain XValue"""
-        if -1 <= xval <= 1:
+        """Get Ballooning Value (%) for a certain XValue or an array of XValues"""
+        if np.all((-1 <= np.asarray(xval)) & (np.asarray(xval) <= 1)):
             return self.interpolation(xval)
         else:
             raise ValueError("Value {} not between -1 and 1".format(xval))
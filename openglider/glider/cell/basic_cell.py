@@ -1,9 +1,8 @@
 from __future__ import division
 import copy
-import math
 import numpy as np
 from openglider.airfoil import Profile3D
-from openglider.utils.cache import CachedObject, cached_property
+from openglider.utils.cache import CachedObject, cached_function, cached_property
 from openglider.vector import normalize, norm
 
 
@@ -38,54 +37,80 @@ class BasicCell(CachedObject):
             return self.prof2
         else:  # somewhere else
             # self._checkxvals()
-            midrib = []
-
             # Ballooning is considered to be arcs, following 2 (two!) simple rules:
             # 1: x1 = x*d
             # 2: x2 = R*normvekt*(cos(phi2)-cos(phi)
             # 3: norm(d)/r*(1-x) = 2*sin(phi(2))
+            # single midribs are not cached, so they don't evict the batches
+            y_values = np.array([y_value], dtype=float)
             if with_numpy:
-                l_phi = np.array(self.ballooning_phi)
-                l_n = np.array(self.normvectors)
-                l_r = np.array(self.ballooning_radius)
-                l_diff = self.prof1.data - self.prof2.data
-
-                l_phi = l_phi + (1e-10 - l_phi) * (l_phi <= 0.0)
-                l_psi = l_phi * 2 * y_value
-                l_h = np.cos(l_phi - l_psi) - np.cos(l_phi)
-                l_d = 0.5 * (1 - np.sin(l_phi - l_psi) / np.sin(l_phi))
-                l_r = l_r * (l_r > 0.0)
-                l_midrib = self.prof1.data.T - l_d * l_diff.T + (l_h * l_r) * l_n.T
-                return Profile3D(l_midrib.T)
-
-            for i, _ in enumerate(
-                self.prof1.data
-            ):  # Arc -> phi(bal) -> r  # oder so...
-                diff = self.prof1[i] - self.prof2[i]
-                if close_trailing_edge and i in (0, len(self.prof1.data) - 1):
-                    d = y_value
-                    h = 0.0
-                elif ballooning and self.ballooning_radius[i] > 0.0:
-                    phi = self.ballooning_phi[i]  # phi is half only the half
-                    if arc_argument:
-                        psi = phi * 2 * y_value  # psi [-phi:phi]
-                        d = 0.5 - 0.5 * math.sin(phi - psi) / math.sin(phi)
-                        h = math.cos(phi - psi) - math.cos(phi)
-                    else:
-                        d = y_value
-                        h = math.cos(math.asin((2 * d - 1) * math.sin(phi))) - math.cos(
-                            phi
-                        )
-                else:  # Without ballooning
-                    d = y_value
-                    h = 0.0
-                midrib.append(
-                    self.prof1[i]
-                    - diff * d
-                    + self.normvectors[i] * h * self.ballooning_radius[i]
+                tensor = self._get_midribs(y_values, True, True, False)
+            else:
+                tensor = self._get_midribs(
+                    y_values, ballooning, arc_argument, close_trailing_edge
                 )
+            return Profile3D(tensor[0], copy=False)
+
+    def midribs(
+        self, y_values, ballooning=True, arc_argument=True, close_trailing_edge=False
+    ):
+        """
+        Get multiple midribs at once
+        :param y_values: list of spanwise positions (0-1)
+        :return: array of shape (len(y_values), numpoints, 3)
+        """
+        y_values = np.asarray(y_values, dtype=float).reshape(-1)
+        return self._midribs(y_values, ballooning, arc_argument, close_trailing_edge)
+
+    @cached_function("prof1", "prof2", "ballooning_phi", maxsize=16)
+    def _midribs(self, y_values, ballooning, arc_argument, close_trailing_edge):
+        midribs = self._get_midribs(
+            y_values, ballooning, arc_argument, close_trailing_edge
+        )
+        # the cached result is shared by all callers
+        midribs.flags.writeable = False
+
+        return midribs
+
+    def _get_midribs(self, y_values, ballooning, arc_argument, close_trailing_edge):
+        prof1 = self.prof1.data
+        prof2 = self.prof2.data
+        diff = prof1 - prof2
+        radius = self.ballooning_radius
+        numpoints = len(prof1)
+
+        # shapes: y -> (n_y, 1), points -> (1, numpoints)
+        y = y_values[:, np.newaxis]
+        d = np.repeat(y, numpoints, axis=1)
+        h = np.zeros_like(d)
+
+        ballooned = np.zeros(numpoints, dtype=bool)
+        if ballooning:
+            ballooned = radius > 0.0
+        if close_trailing_edge and numpoints:
+            ballooned[[0, -1]] = False
+
+        if np.any(ballooned):
+            phi = np.array(self.ballooning_phi, dtype=float)[ballooned]  # half angle
+            if arc_argument:
+                psi = phi * 2 * y  # psi [-phi:phi]
+                d[:, ballooned] = 0.5 - 0.5 * np.sin(phi - psi) / np.sin(phi)
+                h[:, ballooned] = np.cos(phi - psi) - np.cos(phi)
+            else:
+                h[:, ballooned] = np.cos(np.arcsin((2 * y - 1) * np.sin(phi))) - np.cos(
+                    phi
+                )
+
+        midribs = (
+            prof1
+            - diff * d[:, :, np.newaxis]
+            + self.normvectors * h[:, :, np.newaxis] * radius[:, np.newaxis]
+        )
+        # the outer ribs are returned unchanged
+        midribs[y_values == 0] = prof1
+        midribs[y_values == 1] = prof2
 
-            return Profile3D(midrib)
+        return midribs
 
     @cached_property("prof1", "prof2")
     def normvectors(self, j=None):
@@ -21,6 +21,7 @@ from openglider.utils.cache import (
     cached_property,
     hash_list,
 )
+from openglider.utils.disk_cache import disk_cached
 from openglider.vector import PolyLine2D, norm, normalize
 
 logging.getLogger(__file__)
@@ -36,6 +37,8 @@ class Cell(CachedObject):
 
     sigma_3d_cut = 0.04
 
+    hashlist = ("rib1", "rib2", "miniribs", "diagonals")
+
     def __init__(
         self,
         rib1,
@@ -190,26 +193,23 @@ class Cell(CachedObject):
         if not self.miniribs:
             return cells
 
-        for index, xvalue in enumerate(self.x_values):
-            left_point = self.rib1.profile_3d.data[index]
-            right_point = self.rib2.profile_3d.data[index]
-            bl = self.ballooning[xvalue]
-
-            l = norm(right_point - left_point)  # L
-            lnew = sum(
-                [norm(c.prof1.data[index] - c.prof2.data[index]) for c in cells]
-            )  # L-NEW
-
-            for c in cells:
-                if bl > 0:
-                    newval = l / lnew * (bl + 1 / 2) - 1 / 2
-                    # newval = l/lnew / bl
-                    # newval = lnew / l / bl if bl != 0 else 1
-                    c.ballooning_phi.append(
-                        Ballooning.arcsinc(1 / (1 + newval))
-                    )  # B/L NEW 1 / (bl * l / lnew)
-                else:
-                    c.ballooning_phi.append(0.0)
+        ballooning = self.ballooning[np.asarray(self.x_values, dtype=float)]
+        l = np.linalg.norm(
+            self.rib2.profile_3d.data - self.rib1.profile_3d.data, axis=1
+        )  # L
+        lnew = sum(
+            np.linalg.norm(c.prof1.data - c.prof2.data, axis=1) for c in cells
+        )  # L-NEW
+
+        phi = np.zeros(len(ballooning))
+        positive = ballooning > 0
+        newval = l[positive] / lnew[positive] * (ballooning[positive] + 1 / 2) - 1 / 2
+        # newval = l/lnew / bl
+        # newval = lnew / l / bl if bl != 0 else 1
+        phi[positive] = Ballooning.arcsinc(1 / (1 + newval))  # B/L NEW 1 / (bl * l / lnew)
+
+        for c in cells:
+            c.ballooning_phi = HashedList(phi)
         return cells
 
     @property
@@ -262,9 +262,41 @@ class Cell(CachedObject):
         else:
             return self.basic_cell.midrib(y, ballooning=False)
 
+    def midribs(
+        self, y_values, ballooning=True, arc_argument=True, close_trailing_edge=False
+    ):
+        """
+        Get multiple midribs at once (see BasicCell.midribs)
+        :param y_values: list of spanwise positions (0-1)
+        :return: array of shape (len(y_values), numpoints, 3)
+        """
+        kwargs = {
+            "ballooning": ballooning,
+            "arc_argument": arc_argument,
+            "close_trailing_edge": close_trailing_edge,
+        }
+        y_values = np.asarray(y_values, dtype=float).reshape(-1)
+        if len(self._child_cells) == 1 or not ballooning:
+            return self.basic_cell.midribs(y_values, **kwargs)
+
+        yvalues = np.array(self._yvalues, dtype=float)
+        # index of the child-cell: first i with yvalues[i+1] >= y
+        cell_indices = np.searchsorted(yvalues[1:-1], y_values, side="left")
+
+        midribs = np.empty((len(y_values), len(self.prof1.data), 3))
+        for i, cell in enumerate(self._child_cells):
+            selection = cell_indices == i
+            if np.any(selection):
+                y_new = (y_values[selection] - yvalues[i]) / (
+                    yvalues[i + 1] - yvalues[i]
+                )
+                midribs[selection] = cell.midribs(y_new, **kwargs)
+
+        return midribs
+
     def get_midribs(self, numribs):
         y_values = linspace(0, 1, numribs)
-        return [self.midrib(y) for y in y_values]
+        return [Profile3D(rib, copy=False) for rib in self.midribs(y_values)]
 
     def get_spline(self, numribs, u_poles=20, v_poles=4, u_degree=3, v_degree=3):
         try:
@@ -308,11 +340,12 @@ class Cell(CachedObject):
         "ballooning", "rib1.profile_2d.numpoints", "rib2.profile_2d.numpoints"
     )
     def ballooning_phi(self):
-        x_values = self.rib1.profile_2d.x_values
-        balloon = [self.ballooning[i] for i in x_values]
-        return HashedList(
-            [Ballooning.arcsinc(1.0 / (1 + bal)) if bal > 0 else 0 for bal in balloon]
-        )
+        x_values = np.asarray(self.rib1.profile_2d.x_values, dtype=float)
+        balloon = self.ballooning[x_values]
+        phi = np.zeros(len(balloon))
+        positive = balloon > 0
+        phi[positive] = Ballooning.arcsinc(1.0 / (1 + balloon[positive]))
+        return HashedList(phi)
 
     @property
     def span(self):
@@ -386,15 +419,12 @@ class Cell(CachedObject):
         """
         numribs += 1
 
-        grid = []
         rib_indices = range(numribs + 1)
         if half_cell:
             rib_indices = rib_indices[(numribs) // 2 :]
-        for rib_no in rib_indices:
-            y = rib_no / max(numribs, 1)
-            rib = self.midrib(y, with_numpy=with_numpy).data
-            grid.append(Vertex.from_vertices_list(rib[:-1]))
-        return grid
+        y_values = [rib_no / max(numribs, 1) for rib_no in rib_indices]
+
+        return [Vertex.from_vertices_list(rib[:-1]) for rib in self.midribs(y_values)]
 
     def get_mesh(self, numribs=0, with_numpy=False, half_cell=False):
         """
@@ -491,30 +521,34 @@ class Cell(CachedObject):
         return mesh
 
     @cached_function("self")
+    @disk_cached("rib_profiles_3d", "ballooning_phi", "_yvalues")
     def get_flattened_cell(self, numribs=50):
-        midribs = self.get_midribs(numribs)
-        numpoints = len(midribs[0])
-
-        len_dct = {}
-
-        def get_length(ik1, ik2):
-            index_str = f"{ik1}:{ik2}"
-            if index_str not in len_dct:
-                points = []
-                for i, rib in enumerate(midribs):
-                    x = ik1 + i / (numribs - 1) * (ik2 - ik1)
-                    points.append(rib[x])
-
-                line = openglider.vector.PolyLine(points)
-
-                len_dct[index_str] = line.get_length()
-
-            return len_dct[index_str]
-
-        l_0 = get_length(0, 0)
-
-        left_bal = [np.array([0, 0])]
-        right_bal = [np.array([l_0, 0])]
+        return self._flatten(numribs)
+
+    def _flatten(self, numribs):
+        midribs = self.midribs(linspace(0, 1, numribs))
+        numpoints = midribs.shape[1]
+        steps = np.arange(numribs) / (numribs - 1)
+
+        def get_lengths(offset):
+            """
+            spanwise lengths of all lines from (rib1, ik) to (rib2, ik + offset)
+            """
+            ik = np.arange(numpoints - offset)
+            x_values = ik[np.newaxis, :] + steps[:, np.newaxis] * offset
+            # same interpolation as PolyLine.__getitem__
+            indices = np.minimum(x_values.astype(int), numpoints - 2)
+            k = (x_values - indices)[:, :, np.newaxis]
+            rib_indices = np.arange(numribs)[:, np.newaxis]
+            p1 = midribs[rib_indices, indices]
+            points = p1 + k * (midribs[rib_indices, indices + 1] - p1)
+
+            return np.linalg.norm(np.diff(points, axis=0), axis=2).sum(axis=0)
+
+        lengths = get_lengths(0).tolist()
+        diagonals = get_lengths(1).tolist()
+        d_left = np.linalg.norm(np.diff(midribs[0], axis=0), axis=1).tolist()
+        d_right = np.linalg.norm(np.diff(midribs[-1], axis=0), axis=1).tolist()
 
         def get_point(p1, p2, l_0, l_l, l_r, left=True):
             lx = (l_0**2 + l_l**2 - l_r**2) / (2 * l_0)
@@ -523,61 +557,59 @@ class Cell(CachedObject):
                 ly = math.sqrt(ly_sq)
             else:
                 ly = 0
-            diff = openglider.vector.normalize(p2 - p1)
-            if left:
-                diff_y = diff.dot([[0, 1], [-1, 0]])
-            else:
-                diff_y = diff.dot([[0, -1], [1, 0]])
-
-            return p1 + lx * diff + ly * diff_y
+            diff_x = p2[0] - p1[0]
+            diff_y = p2[1] - p1[1]
+            diff_length = math.hypot(diff_x, diff_y)
+            diff_x /= diff_length
+            diff_y /= diff_length
+            if not left:
+                ly = -ly
+
+            return p1[0] + lx * diff_x - ly * diff_y, p1[1] + lx * diff_y + ly * diff_x
+
+        # unfold the cell triangle by triangle
+        left_bal = np.zeros((numpoints, 2))
+        right_bal = np.zeros((numpoints, 2))
+        right_bal[0, 0] = lengths[0]
+        p1 = (0.0, 0.0)
+        p2 = (lengths[0], 0.0)
 
         for i in range(numpoints - 1):
-            p1 = left_bal[-1]
-            p2 = right_bal[-1]
-
-            d_l = openglider.vector.norm(midribs[0][i] - midribs[0][i + 1])
-            d_r = openglider.vector.norm(midribs[-1][i] - midribs[-1][i + 1])
-            l_0 = get_length(i, i)
-
-            if False:
-                pl_2 = get_point(p1, p2, l_0, d_l, get_length(i + 1, i))
-                pr_2 = get_point(
-                    p2,
-                    pl_2,
-                    get_length(i + 1, i),
-                    d_r,
-                    get_length(i + 1, i + 1),
-                    left=False,
-                )
-            else:
-                pr_2 = get_point(p2, p1, l_0, d_r, get_length(i, i + 1), left=False)
-                pl_2 = get_point(
-                    p1, pr_2, get_length(i, i + 1), d_l, get_length(i + 1, i + 1)
-                )
-
-            left_bal.append(pl_2)
-            right_bal.append(pr_2)
-            # right_bal.append(get_point(p2, p1, l_0, d_r, get_length(i, i+1), left=False))
+            p2 = get_point(p2, p1, lengths[i], d_right[i], diagonals[i], left=False)
+            p1 = get_point(p1, p2, diagonals[i], d_left[i], lengths[i + 1])
 
-        ballooned = [PolyLine2D(left_bal), PolyLine2D(right_bal)]
+            left_bal[i + 1] = p1
+            right_bal[i + 1] = p2
 
-        inner = []
-        for x in openglider.utils.linspace(0, 1, numribs + 2):
-            l1 = ballooned[0] * (1 - x)
-            l2 = ballooned[1] * x
-            inner.append(l1.add(l2))
+        ballooned = [PolyLine2D(left_bal, copy=False), PolyLine2D(right_bal, copy=False)]
 
-        # ballooned = [left_bal, right_bal]
+        x_values = np.array(linspace(0, 1, numribs + 2))[:, np.newaxis, np.newaxis]
+        inner = left_bal * (1 - x_values) + right_bal * x_values
 
-        return {"inner": inner, "ballooned": ballooned}
+        return {
+            "inner": [PolyLine2D(line, copy=False) for line in inner],
+            "ballooned": ballooned,
+        }
 
     def calculate_3d_shaping(self, panels=None, numribs=10):
         if panels is None:
             panels = self.panels
 
-        flat = self.get_flattened_cell(numribs)
-        inner = flat["inner"]
+        jobs = self._get_3d_shaping_jobs(panels, numribs)
+        amounts = Panel.integrate_3d_shaping_batch(jobs)
+        self._set_3d_shaping(panels, amounts, numribs)
+
+    def _get_3d_shaping_jobs(self, panels, numribs):
+        """
+        Arguments for Panel.integrate_3d_shaping_batch
+        """
+        inner = self.get_flattened_cell(numribs)["inner"]
+        return [(panel, self, self.sigma_3d_cut, inner) for panel in panels]
 
+    def _set_3d_shaping(self, panels, amounts, numribs):
+        """
+        Store the integrated (front, back) amounts of the panels in their cuts
+        """
         cuts_3d = {}
 
         def cut_hash(cut):
@@ -601,11 +633,7 @@ class Cell(CachedObject):
             # TODO: Investigate
             return [max(0, x) for x in data]
 
-        for panel in panels:
-            amount_front, amount_back = panel.integrate_3d_shaping(
-                self, self.sigma_3d_cut, inner
-            )
-
+        for panel, (amount_front, amount_back) in zip(panels, amounts):
             add_amount(panel.cut_front, amount_front)
             add_amount(panel.cut_back, amount_back)
 
@@ -22,15 +22,16 @@ import logging
 from typing import Tuple
 import numpy as np
 import math
+from scipy.special import erf
 
 import openglider.vector
-from openglider.airfoil import get_x_value
+from openglider.airfoil import Profile3D, get_x_value
 from openglider.mesh import Mesh, triangulate
 from openglider.utils.cache import cached_function, hash_list
 from openglider.vector import norm, PolyLine
 from openglider.vector.polyline import PolyLine2D
 from openglider.vector.projection import flatten_list
-from openglider.utils import Config
+from openglider.utils import Config, linspace
 
 
 from typing import TYPE_CHECKING
@@ -439,7 +440,7 @@ class Panel(object):
         Get Panel-mesh
         :param cell: the parent cell of the panel
         :param numribs: number of interpolation steps between ribs
-        :param with_numpy: compute midribs with numpy (faster if available)
+        :param with_numpy: unused (midribs are always computed with numpy)
         :return: mesh objects consisting of triangles and quadrangles
         """
         numribs += 1
@@ -449,8 +450,8 @@ class Panel(object):
         points = []
         nums = []
         count = 0
-        for rib_no in range(numribs + 1):
-            y = rib_no / max(numribs, 1)
+        y_values = [rib_no / max(numribs, 1) for rib_no in range(numribs + 1)]
+        for y, midrib_data in zip(y_values, cell.midribs(y_values)):
             x1 = self.cut_front["left"] + y * (
                 self.cut_front["right"] - self.cut_front["left"]
             )
@@ -460,7 +461,7 @@ class Panel(object):
                 self.cut_back["right"] - self.cut_back["left"]
             )
             back = get_x_value(xvalues, x2)
-            midrib = cell.midrib(y, with_numpy=with_numpy)
+            midrib = Profile3D(midrib_data, copy=False)
             ribs.append([x for x in midrib.get_positions(front, back)])
             points += list(midrib[front:back])
             nums.append([i + count for i, _ in enumerate(ribs[-1])])
@@ -617,97 +618,139 @@ class Panel(object):
         :param midribs: precomputed midribs, None by default
         :return: front, back (lists of lengths) with length equal to number of midribs
         """
+        lengths = self._get_3d_shaping_lengths(cell, inner_2d, midribs)
+        return self._integrate_3d_shaping([self], [sigma], [lengths])[0]
+
+    @classmethod
+    def integrate_3d_shaping_batch(cls, jobs):
+        """
+        Integrate the 3d-shaping of many panels (p.e. of a whole glider) at once
+        :param jobs: list of (panel, cell, sigma, inner_2d)
+        :return: list of (front, back) for every job
+        """
+        if not jobs:
+            return []
+
+        panels = [job[0] for job in jobs]
+        sigmas = [job[2] for job in jobs]
+        lengths = [
+            panel._get_3d_shaping_lengths(cell, inner_2d)
+            for panel, cell, _, inner_2d in jobs
+        ]
+        return cls._integrate_3d_shaping(panels, sigmas, lengths)
+
+    def _get_3d_shaping_lengths(self, cell: "Cell", inner_2d, midribs=None):
+        """
+        Segment-lengths of the panel for every rib of the flattened cell
+        :return: lengths_2d, lengths_3d (arrays of shape (numribs + 2, n), padded with zeros)
+        """
         numribs = len(inner_2d) - 2
         if midribs is None or len(midribs) != len(inner_2d):
-            midribs = cell.get_midribs(numribs)
-
-        ribs = [cell.prof1] + midribs + [cell.prof2]
-
-        # ! vorn + hinten < gesamt !
-
-        positions = self._get_ik_values(cell, numribs, exact=True)
-
-        front = []
-        back = []
-
-        ff = math.sqrt(math.pi / 2) * sigma
-
-        for rib_no in range(numribs + 2):
-            x1, x2 = positions[rib_no]
-            rib_2d = inner_2d[rib_no][x1:x2]
-            rib_3d = ribs[rib_no][x1:x2]
-
-            lengthes_2d = rib_2d.get_segment_lengthes()
-            lengthes_3d = rib_3d.get_segment_lengthes()
-
-            distance = 0
-            amount_front = 0
-            # influence factor: e^-(x^2/(2*sigma^2))
-            # -> sigma = einflussfaktor [m]
-            # integral = sqrt(pi/2)*sigma * [ erf(x / (sqrt(2)*sigma) ) ]
-
-            def integrate(lengths_2d, lengths_3d):
-                amount = 0
-                distance = 0
+            midribs = list(cell.midribs(linspace(0, 1, numribs)))
+        else:
+            midribs = [getattr(rib, "data", rib) for rib in midribs]
+
+        ribs_3d = np.array([cell.prof1.data] + midribs + [cell.prof2.data])[: numribs + 2]
+        ribs_2d = np.array([line.data for line in inner_2d])
+
+        positions = [
+            inner_2d[rib_no].get_positions(x1, x2)
+            for rib_no, (x1, x2) in enumerate(self._get_ik_values(cell, numribs, exact=True))
+        ]
+        # repeating the last position adds zero-length segments
+        num = max(len(rib_positions) for rib_positions in positions)
+        iks = np.array(
+            [
+                rib_positions + [rib_positions[-1]] * (num - len(rib_positions))
+                for rib_positions in positions
+            ],
+            dtype=float,
+        )
 
-                for l2d, l3d in zip(lengths_2d, lengths_3d):
-                    if l3d > 0:
-                        factor = (l3d - l2d) / l3d
-                        x = math.erf(
-                            (distance + l3d) / (sigma * math.sqrt(2))
-                        ) - math.erf(distance / (sigma * math.sqrt(2)))
+        def get_lengths(lines):
+            # same interpolation as PolyLine.get_points
+            last = lines.shape[1] - 1
+            rib_indices = np.arange(len(lines))[:, np.newaxis]
+            i = np.clip(np.floor(iks).astype(int), 0, last - 1)
+            k = (iks - i)[..., np.newaxis]
+            p1 = lines[rib_indices, i]
+            points = p1 + k * (lines[rib_indices, i + 1] - p1)
+            is_last = iks == last
+            points[is_last] = lines[np.nonzero(is_last)[0], last]
 
-                        amount += factor * x
-                    distance += l3d
+            return np.linalg.norm(np.diff(points, axis=1), axis=2)
 
-                return amount
+        return get_lengths(ribs_2d), get_lengths(ribs_3d)
 
-            amount_back = integrate(lengthes_2d, lengthes_3d)
-            amount_front = integrate(lengthes_2d[::-1], lengthes_3d[::-1])
+    @staticmethod
+    def _integrate_3d_shaping(panels, sigmas, lengths):
+        """
+        Gaussian-weighted integration of the length differences for all ribs of all panels
+        """
+        # ! vorn + hinten < gesamt !
+        num = max(lengths_3d.shape[1] for _, lengths_3d in lengths)
 
-            for l2d, l3d in zip(lengthes_2d, lengthes_3d):
-                if l3d > 0:
-                    factor = (l3d - l2d) / l3d
-                    x = math.erf((distance + l3d) / (sigma * math.sqrt(2))) - math.erf(
-                        distance / (sigma * math.sqrt(2))
-                    )
+        def stack(arrays):
+            return np.concatenate(
+                [np.pad(array, ((0, 0), (0, num - array.shape[1]))) for array in arrays]
+            )
 
-                    amount_front += factor * x
-                distance += l3d
+        lengths_2d = stack([l_2d for l_2d, _ in lengths])
+        lengths_3d = stack([l_3d for _, l_3d in lengths])
+        sigma = np.concatenate(
+            [[sigma] * len(l_3d) for sigma, (_, l_3d) in zip(sigmas, lengths)]
+        )[:, np.newaxis]
+
+        # influence factor: e^-(x^2/(2*sigma^2))
+        # -> sigma = einflussfaktor [m]
+        # integral = sqrt(pi/2)*sigma * [ erf(x / (sqrt(2)*sigma) ) ]
+        def integrate(lengths_2d, lengths_3d):
+            distance_end = np.cumsum(lengths_3d, axis=1)
+            distance_start = np.zeros_like(distance_end)
+            distance_start[:, 1:] = distance_end[:, :-1]
+
+            has_length = lengths_3d > 0
+            factor = np.zeros_like(lengths_3d)
+            factor[has_length] = (
+                lengths_3d[has_length] - lengths_2d[has_length]
+            ) / lengths_3d[has_length]
+            x = erf(distance_end / (sigma * math.sqrt(2))) - erf(
+                distance_start / (sigma * math.sqrt(2))
+            )
 
-            distance = 0
-            amount_back = 0
+            return np.sum(factor * x, axis=1)
 
-            for l2d, l3d in zip(lengthes_2d[::-1], lengthes_3d[::-1]):
-                if l3d > 0:
-                    factor = (l3d - l2d) / l3d
-                    x = math.erf((distance + l3d) / (sigma * math.sqrt(2))) - math.erf(
-                        distance / (sigma * math.sqrt(2))
-                    )
-                    amount_back += factor * x
-                distance += l3d
+        # the front-amount sums up both directions
+        amount_back = integrate(lengths_2d[:, ::-1], lengths_3d[:, ::-1])
+        amount_front = amount_back + integrate(lengths_2d, lengths_3d)
 
-            total = 0
-            for l2d, l3d in zip(lengthes_2d, lengthes_3d):
-                total += l3d - l2d
+        ff = np.sqrt(np.pi / 2) * sigma[:, 0]
+        amount_front *= ff
+        amount_back *= ff
+        total = np.sum(lengths_3d - lengths_2d, axis=1)
 
-            amount_front *= ff
-            amount_back *= ff
+        result = []
+        start = 0
+        for panel, (_, l_3d) in zip(panels, lengths):
+            rows = slice(start, start + len(l_3d))
+            start = rows.stop
+            front = amount_front[rows]
+            back = amount_back[rows]
 
-            if self.cut_front["type"] != "cut_3d" and self.cut_back["type"] != "cut_3d":
-                if abs(amount_front + amount_back) > abs(total):
-                    normalization = abs(total / (amount_front + amount_back))
-                    amount_front *= normalization
-                    amount_back *= normalization
+            if panel.cut_front["type"] != "cut_3d" and panel.cut_back["type"] != "cut_3d":
+                amount = front + back
+                normalize = np.abs(amount) > np.abs(total[rows])
+                normalization = np.ones_like(amount)
+                normalization[normalize] = np.abs(total[rows][normalize] / amount[normalize])
+                front = front * normalization
+                back = back * normalization
 
-            if rib_no == 0 or rib_no == numribs + 1:
-                amount_front = 0
-                amount_back = 0
+            front[[0, -1]] = 0
+            back[[0, -1]] = 0
 
-            front.append(amount_front)
-            back.append(amount_back)
+            result.append((front.tolist(), back.tolist()))
 
-        return front, back
+        return result
 
 
 class PanelRigidFoil:
@@ -0,0 +1,153 @@
+"""
+Cell-parallel flattening and 3d-shaping.
+
+Both steps are independent for every cell, so they can run in a process-pool.
+Workers only receive a CellData snapshot (rib profiles, ballooning, x-values
+and panel cuts) and return plain arrays. The results are stored in the caches
+of the cells in their original order.
+"""
+from __future__ import annotations
+import concurrent.futures
+import os
+
+import numpy as np
+
+import openglider
+from openglider.airfoil import Profile3D
+from openglider.glider.cell.basic_cell import BasicCell
+from openglider.glider.cell.cell import Cell
+from openglider.glider.cell.elements import Panel
+from openglider.vector.polyline import PolyLine2D
+
+
+class _Rib(object):
+    """
+    Stands in for rib and rib.profile_2d (only the x-values are used)
+    """
+
+    def __init__(self, x_values):
+        self.profile_2d = self
+        self.x_values = x_values
+
+
+class CellData(object):
+    """
+    Picklable snapshot of everything needed to flatten a cell.
+    Implements the parts of the Cell-interface used by the flattening and Panel.integrate_3d_shaping
+    """
+
+    def __init__(self, cell: Cell):
+        self.name = cell.name
+        self.prof1_data = np.array(cell.prof1.data)
+        self.prof2_data = np.array(cell.prof2.data)
+        self.ballooning = np.array(cell.ballooning_phi, dtype=float)
+        self.x_values = (
+            np.array(cell.rib1.profile_2d.x_values),
+            np.array(cell.rib2.profile_2d.x_values),
+        )
+        self.sigma_3d_cut = cell.sigma_3d_cut
+        self.cuts = [
+            tuple(
+                {key: value for key, value in cut.items() if key != "amount_3d"}
+                for cut in (panel.cut_front, panel.cut_back)
+            )
+            for panel in cell.panels
+        ]
+
+        self._yvalues = cell._yvalues
+        self.child_data = []
+        if len(cell._child_cells) > 1:
+            self.child_data = [
+                (
+                    np.array(child.prof1.data),
+                    np.array(child.prof2.data),
+                    np.array(child.ballooning_phi, dtype=float),
+                )
+                for child in cell._child_cells
+            ]
+
+        self._setup()
+
+    def __repr__(self):
+        return f"<CellData {self.name}>"
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        for key in ("prof1", "prof2", "rib1", "rib2", "basic_cell", "_child_cells", "_flattened"):
+            state.pop(key)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._setup()
+
+    def _setup(self):
+        self.prof1 = Profile3D(self.prof1_data, copy=False)
+        self.prof2 = Profile3D(self.prof2_data, copy=False)
+        self.rib1 = _Rib(self.x_values[0])
+        self.rib2 = _Rib(self.x_values[1])
+        self.basic_cell = BasicCell(self.prof1, self.prof2, self.ballooning)
+        self._child_cells = [
+            BasicCell(Profile3D(prof1, copy=False), Profile3D(prof2, copy=False), phi)
+            for prof1, prof2, phi in self.child_data
+        ] or [self.basic_cell]
+        self._flattened = {}
+
+    midribs = Cell.midribs
+    _flatten = Cell._flatten
+
+    def get_flattened_cell(self, numribs=50):
+        if numribs not in self._flattened:
+            self._flattened[numribs] = self._flatten(numribs)
+        return self._flattened[numribs]
+
+
+def process_cell(data: CellData, numribs):
+    """
+    Flatten a cell and integrate the 3d-shaping of its panels (runs in the workers)
+    :return: {"ballooned": array (2, n, 2), "inner": array (numribs+2, n, 2), "amounts": [(front, back), ...]}
+    """
+    flat = data.get_flattened_cell(numribs)
+    panels = [Panel(cut_front, cut_back) for cut_front, cut_back in data.cuts]
+    jobs = [(panel, data, data.sigma_3d_cut, flat["inner"]) for panel in panels]
+
+    return {
+        "ballooned": np.array([line.data for line in flat["ballooned"]]),
+        "inner": np.array([line.data for line in flat["inner"]]),
+        "amounts": Panel.integrate_3d_shaping_batch(jobs),
+    }
+
+
+def get_workers(workers=None):
+    """
+    :param workers: number of processes (None -> openglider.config["cell_workers"])
+    :return: the number of processes to use (0 or None in the config -> all cores)
+    """
+    if workers is None:
+        workers = openglider.config["cell_workers"]
+    return workers or os.cpu_count() or 1
+
+
+def calculate_3d_shaping(cells, numribs=10, workers=None):
+    """
+    Flatten the cells and calculate the 3d-shaping amounts of all panels in a process-pool.
+    With a single worker the same steps run serially in the current process (for debugging).
+    """
+    cells = list(cells)
+    workers = min(get_workers(workers), len(cells))
+    snapshots = [CellData(cell) for cell in cells]
+
+    if workers <= 1:
+        results = [process_cell(snapshot, numribs) for snapshot in snapshots]
+    else:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+            # executor.map keeps the order of the cells
+            results = list(executor.map(process_cell, snapshots, [numribs] * len(cells)))
+
+    for cell, result in zip(cells, results):
+        flattened = {
+            "inner": [PolyLine2D(line, copy=False) for line in result["inner"]],
+            "ballooned": [PolyLine2D(line, copy=False) for line in result["ballooned"]],
+        }
+        cell.get_flattened_cell.set(flattened, numribs)
+        cell._set_3d_shaping(cell.panels, result["amounts"], numribs)
@@ -28,9 +28,11 @@ import numpy as np
 import openglider
 
 from openglider.glider.cell.cell import Cell
+from openglider.glider.cell import parallel
+from openglider.glider.cell.elements import Panel
 from openglider.glider.in_out import IMPORT_GEOMETRY, EXPORT_3D
 from openglider.glider.shape import Shape
-from openglider.mesh import Mesh
+from openglider.mesh import Mesh, grid_quads
 from openglider.utils import consistent_value
 from openglider.utils.distribution import Distribution
 from openglider.vector.functions import norm, rotation_2d
@@ -138,6 +140,28 @@ class Glider(object):
 
         return panels
 
+    def calculate_3d_shaping(self, numribs=10, workers=None):
+        """
+        Calculate the 3d-shaping amounts of all panels (integrated in one batch)
+        :param numribs: number of midribs per cell
+        :param workers: number of processes to flatten the cells in parallel
+            (None -> openglider.config["cell_workers"])
+        """
+        if parallel.get_workers(workers) > 1:
+            return parallel.calculate_3d_shaping(self.cells, numribs, workers)
+
+        jobs = []
+        for cell in self.cells:
+            jobs += cell._get_3d_shaping_jobs(cell.panels, numribs)
+
+        amounts = Panel.integrate_3d_shaping_batch(jobs)
+
+        start = 0
+        for cell in self.cells:
+            end = start + len(cell.panels)
+            cell._set_3d_shaping(cell.panels, amounts[start:end], numribs)
+            start = end
+
     def get_mesh(self, midribs=0, add_lines=True):
         mesh = Mesh()
         for rib in self.ribs:
@@ -164,30 +188,50 @@ class Glider(object):
         return mesh
 
     def get_mesh_hull(self, num_midribs=0, ballooning=True):
-        ribs = self.return_ribs(num=num_midribs, ballooning=ballooning)
-
-        num = len(ribs)
-        numpoints = len(ribs[0])  # points per rib
-
-        polygons = []
-        boundary = {"ribs": [], "trailing_edge": []}
-        for i in range(num - 1):  # because we use i+1 below
-            boundary["trailing_edge"].append(i * numpoints)
-            if not i % (num_midribs + 1):
-                boundary["ribs"] += [i * numpoints + k for k in range(numpoints - 1)]
-
-            for k in range(numpoints - 1):  # same reason as above
-                kplus = (k + 1) % (numpoints - 1)
-                polygons.append(
-                    [
-                        i * numpoints + k,
-                        i * numpoints + kplus,
-                        (i + 1) * numpoints + kplus,
-                        (i + 1) * numpoints + k,
-                    ]
-                )
-
-        return Mesh.from_indexed(np.concatenate(ribs), {"hull": polygons}, boundary)
+        vertices, quads, boundary = self.get_hull_arrays(num_midribs, ballooning)
+        return Mesh.from_indexed(vertices, {"hull": quads}, boundary)
+
+    def get_hull_arrays(self, num_midribs=0, ballooning=True):
+        """
+        Get the hull as plain arrays
+        :param num_midribs: number of midribs per cell
+        :param ballooning: calculate ballooned cells
+        :return: vertices (n, 3), quad-indices (m, 4), boundary indices {"ribs": [], "trailing_edge": []}
+        """
+        surface = self.get_surface_array(num_midribs, ballooning)
+        num, numpoints = surface.shape[:2]
+
+        # the last point of each rib equals the first one (trailing edge)
+        quads = grid_quads(num, numpoints - 1, closed=True, row_length=numpoints)
+
+        rib_starts = np.arange(0, num - 1, num_midribs + 1) * numpoints
+        boundary = {
+            "ribs": (rib_starts[:, np.newaxis] + np.arange(numpoints - 1)).ravel(),
+            "trailing_edge": np.arange(num - 1) * numpoints,
+        }
+
+        return surface.reshape(-1, 3), quads, boundary
+
+    def get_surface_array(self, num_midribs=0, ballooning=True):
+        """
+        Get all rib-curves as one array
+        :param num_midribs: number of midribs per cell
+        :param ballooning: calculate ballooned cells
+        :return: array of shape (len(cells) * (num_midribs + 1) + 1, numpoints, 3)
+        """
+        if not self.cells:
+            return np.zeros((0, 0, 3))
+
+        num = num_midribs + 1
+        y_values = np.arange(num) / num
+        numpoints = len(self.cells[0].prof1.data)
+
+        surface = np.empty((len(self.cells) * num + 1, numpoints, 3))
+        for i, cell in enumerate(self.cells):
+            surface[i * num : (i + 1) * num] = cell.midribs(y_values, ballooning=ballooning)
+        surface[-1] = self.cells[-1].prof2.data
+
+        return surface
 
     def return_ribs(self, num=0, ballooning=True):
         """
@@ -196,16 +240,9 @@ class Glider(object):
         :param ballooning: calculate ballooned cells
         :return: nested list of ribs [[[x,y,z],p2,p3...],rib2,rib3,..]
         """
-        num += 1
         if not self.cells:
             return np.array([])
-        # will hold all the points
-        ribs = []
-        for cell in self.cells:
-            for y in range(num):
-                ribs.append(cell.midrib(y * 1.0 / num, ballooning=ballooning).data)
-        ribs.append(self.cells[-1].midrib(1.0).data)
-        return ribs
+        return list(self.get_surface_array(num, ballooning))
 
     def return_ribs_ij(self, num=0):
         """
@@ -15,6 +15,24 @@ def export_obj(glider, path, midribs=0, numpoints=None, floatnum=6, copy=True):
     mesh.export_obj(path)
 
 
+def export_obj_hull(glider, path, midribs=0, numpoints=None, copy=True):
+    """
+    Export only the hull as obj-file (written directly from the surface-array)
+    """
+    other = glider.copy_complete() if copy else glider
+    if numpoints:
+        other.profile_numpoints = numpoints
+
+    vertices, quads, _ = other.get_hull_arrays(midribs)
+    # one format-operation per block is a lot faster than np.savetxt
+    with open(path, "w") as outfile:
+        outfile.write("v %.6f %.6f %.6f\n" * len(vertices) % tuple(vertices.ravel().tolist()))
+        outfile.write("o hull\n")
+        outfile.write("f %d %d %d %d\n" * len(quads) % tuple((quads + 1).ravel().tolist()))
+
+    return path
+
+
 def export_json(
     glider, path, numpoints, midribs=0, wake_panels=1, wake_length=0.2, *other
 ):
@@ -17,6 +17,7 @@ from openglider.glider.rib import RibHole, RigidFoil, Rib, MiniRib
 from openglider.glider.parametric.fitglider import fit_glider_3d
 from openglider.utils.distribution import Distribution
 from openglider.utils.table import Table
+from openglider.utils.cache import cached_function
 from openglider.utils import ZipCmp
 
 
@@ -32,6 +33,7 @@ class ParametricGlider(object):
     num_depth_integral = 100
     num_interpolate = 30
     num_profile = None
+    merge_tolerance = None  # round profile/ballooning merge-factors
 
     def __init__(
         self,
@@ -156,7 +158,11 @@ class ParametricGlider(object):
         ]
 
     def merge_ballooning(self, factor):
-        factor = max(0, min(len(self.balloonings) - 1, factor))
+        factor = self._get_merge_factor(factor, len(self.balloonings))
+        return self._merge_ballooning(factor).copy()
+
+    @cached_function("balloonings", maxsize=128)
+    def _merge_ballooning(self, factor):
         k = factor % 1
         i = int(factor // 1)
         first = self.balloonings[i]
@@ -167,17 +173,31 @@ class ParametricGlider(object):
             return first.copy()
 
     def get_merge_profile(self, factor):
-        factor = max(0, min(len(self.profiles) - 1, factor))
+        factor = self._get_merge_factor(factor, len(self.profiles))
+        return self._merge_profile(factor).copy()
+
+    @cached_function("profiles", maxsize=128)
+    def _merge_profile(self, factor):
         k = factor % 1
         i = int(factor // 1)
-        first = self.profiles[i].copy()
+        first = self.profiles[i]
         if k > 0:
-            second = self.profiles[i + 1]
-            airfoil = first * (1 - k) + second * k
+            airfoil = first.mix(self.profiles[i + 1], k)
         else:
             airfoil = first
         return Profile2D(airfoil.data)
 
+    def _get_merge_factor(self, factor, num):
+        """
+        Clip the merge-factor to the available profiles / balloonings and
+        round it to merge_tolerance (if set) to share the merged results
+        """
+        factor = max(0, min(num - 1, float(factor)))
+        if self.merge_tolerance:
+            factor = round(factor / self.merge_tolerance) * self.merge_tolerance
+            factor = max(0, min(num - 1, factor))
+        return factor
+
     def get_panels(self, glider_3d=None):
         """
         Create Panels Objects and apply on gliders cells if provided, otherwise create a list of panels
@@ -384,6 +404,11 @@ class ParametricGlider(object):
         cell_centers = [(p1 + p2) / 2 for p1, p2 in zip(x_values[:-1], x_values[1:])]
         offset_x = shape_ribs[0][0][1]
 
+        rib_positions = np.array(x_values)
+        profile_factors = profile_merge_curve(np.abs(rib_positions))
+        aoa_values = aoa_int(rib_positions)
+        zrot_values = zrot_int(rib_positions)
+
         rib_material = None
         if "rib_material" in self.elements:
             rib_material = self.elements["rib_material"]
@@ -394,8 +419,7 @@ class ParametricGlider(object):
             startpoint = np.array([-front[1] + offset_x, arc[0], arc[1]])
 
             chord = abs(front[1] - back[1])
-            factor = profile_merge_curve(abs(pos))
-            profile = self.get_merge_profile(factor)
+            profile = self.get_merge_profile(profile_factors[rib_no])
             profile.name = "Profile{}".format(rib_no)
             profile.x_values = profile_x_values
 
@@ -417,15 +441,15 @@ class ParametricGlider(object):
                     chord=chord,
                     arcang=rib_angles[rib_no],
                     glide=self.glide,
-                    aoa_absolute=aoa_int(pos),
-                    zrot=zrot_int(pos),
+                    aoa_absolute=aoa_values[rib_no],
+                    zrot=zrot_values[rib_no],
                     holes=this_rib_holes,
                     rigidfoils=this_rigid_foils,
                     name="rib{}".format(rib_no),
                     material_code=rib_material,
                 )
             )
-            ribs[-1].aoa_relative = aoa_int(pos)
+            ribs[-1].aoa_relative = aoa_values[rib_no]
 
         if self.shape.has_center_cell:
             new_rib = ribs[0].copy()
@@ -435,10 +459,11 @@ class ParametricGlider(object):
             ribs.insert(0, new_rib)
             cell_centers.insert(0, 0.0)
 
+        ballooning_factors = ballooning_merge_curve(np.array(cell_centers))
+
         glider.cells = []
         for cell_no, (rib1, rib2) in enumerate(zip(ribs[:-1], ribs[1:])):
-            ballooning_factor = ballooning_merge_curve(cell_centers[cell_no])
-            ballooning = self.merge_ballooning(ballooning_factor)
+            ballooning = self.merge_ballooning(ballooning_factors[cell_no])
 
             cell = Cell(rib1, rib2, ballooning, name="c{}".format(cell_no + 1))
 
@@ -530,7 +555,9 @@ class ParametricGlider(object):
         def rescale(curve):
             span_orig = curve.controlpoints[-1][0]
             factor = span / span_orig
-            curve._data[:, 0] *= factor
+            data = curve.data.copy()
+            data[:, 0] *= factor
+            curve.data = data
 
         rescale(self.ballooning_merge_curve)
         rescale(self.profile_merge_curve)
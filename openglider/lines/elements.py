@@ -23,7 +23,7 @@ import logging
 
 from openglider.lines import line_types
 from openglider.lines.functions import proj_force, proj_to_surface
-from openglider.utils.cache import cached_property, CachedObject
+from openglider.utils.cache import cached_property, CachedObject, VersionedObject
 from openglider.vector import PolyLine
 from openglider.vector.functions import norm, normalize
 from openglider.mesh import Mesh, Vertex, Polygon
@@ -395,7 +395,7 @@ class Line(CachedObject):
         return f * self.force / l
 
 
-class Node(object):
+class Node(VersionedObject):
     def __init__(
         self, node_type, position_vector=None, attachment_point=None, name=None
     ):
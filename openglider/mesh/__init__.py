@@ -1,2 +1,2 @@
-from openglider.mesh.mesh import Mesh, Vertex, Polygon
+from openglider.mesh.mesh import Mesh, Vertex, Polygon, grid_quads
 from openglider.mesh.group import MeshGroup
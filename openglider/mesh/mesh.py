@@ -239,6 +239,8 @@ class Mesh(object):
     def from_indexed(
         cls, vertices, polygons, boundaries=None, name=None, node_attributes=None
     ):
+        if isinstance(vertices, np.ndarray):
+            vertices = vertices.tolist()
         vertices = [Vertex(*node) for node in vertices]
 
         if node_attributes is not None:
@@ -250,6 +252,13 @@ class Mesh(object):
         polys = {}
 
         for poly_name, polygons in polygons.items():
+            if isinstance(polygons, np.ndarray):
+                # index-arrays (p.e. grid_quads) carry no attributes
+                polys[poly_name] = [
+                    Polygon([vertices[i] for i in poly]) for poly in polygons.tolist()
+                ]
+                continue
+
             new_poly_group = []
             for poly in polygons:
                 poly_vertices = [vertices[i] for i in poly]
@@ -260,6 +269,8 @@ class Mesh(object):
             polys[poly_name] = new_poly_group
 
         for boundary_name, boundary_indices in boundaries.items():
+            if isinstance(boundary_indices, np.ndarray):
+                boundary_indices = boundary_indices.tolist()
             boundaries_new[boundary_name] = [vertices[i] for i in boundary_indices]
 
         return cls(polys, boundaries_new, name)
@@ -594,6 +605,30 @@ class Mesh(object):
         return size_min, size_max, sum / count
 
 
+def grid_quads(num_rows, num_columns, closed=False, row_length=None):
+    """
+    Quad-indices of a structured grid of points stored row by row
+    :param num_rows: number of rows (p.e. ribs)
+    :param num_columns: number of points per row to connect
+    :param closed: connect the last point of every row with the first one
+    :param row_length: index-offset between two rows (defaults to num_columns)
+    :return: integer array of shape (n, 4)
+    """
+    if row_length is None:
+        row_length = num_columns
+    num_quads = num_columns if closed else max(num_columns - 1, 0)
+
+    k = np.arange(num_quads)
+    k_next = (k + 1) % max(num_columns, 1)
+    start = (np.arange(max(num_rows - 1, 0)) * row_length)[:, np.newaxis]
+
+    quads = np.stack(
+        [start + k, start + k_next, start + row_length + k_next, start + row_length + k],
+        axis=-1,
+    )
+    return quads.reshape(-1, 4)
+
+
 def apply_z(vertices):
     v = vertices.T
     return np.array([v[0], np.zeros(len(v[0]), v[1])]).T
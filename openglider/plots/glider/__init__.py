@@ -53,10 +53,13 @@ class PlotMaker(object):
         panels_upper = []
         panels_lower = []
 
+        # flattening and 3d-shaping of all cells (in parallel if configured)
+        self.glider_3d.calculate_3d_shaping(numribs=self.config.midribs)
+
         for cell in self.glider_3d.cells:
             pm = self._get_cellplotmaker(cell)
-            lower = pm.get_panels_lower()
-            upper = pm.get_panels_upper()
+            lower = pm.get_panels_lower(calculate_3d_shaping=False)
+            upper = pm.get_panels_upper(calculate_3d_shaping=False)
             panels_lower.append(
                 Layout.stack_column(lower, self.config.patterns_align_dist_y)
             )
@@ -634,10 +634,11 @@ class CellPlotMaker:
 
         return self._flattened_cell
 
-    def get_panels(self, panels=None):
+    def get_panels(self, panels=None, calculate_3d_shaping=True):
         cell_panels = []
         flattened_cell = self._get_flatten_cell()
-        self.cell.calculate_3d_shaping(numribs=self.config.midribs)
+        if calculate_3d_shaping:
+            self.cell.calculate_3d_shaping(numribs=self.config.midribs)
 
         if panels is None:
             panels = self.cell.panels
@@ -649,13 +650,13 @@ class CellPlotMaker:
 
         return cell_panels
 
-    def get_panels_lower(self):
+    def get_panels_lower(self, calculate_3d_shaping=True):
         panels = [p for p in self.cell.panels if p.is_lower()]
-        return self.get_panels(panels)
+        return self.get_panels(panels, calculate_3d_shaping)
 
-    def get_panels_upper(self):
+    def get_panels_upper(self, calculate_3d_shaping=True):
         panels = [p for p in self.cell.panels if not p.is_lower()]
-        return self.get_panels(panels)
+        return self.get_panels(panels, calculate_3d_shaping)
 
     def get_dribs(self):
         dribs = []
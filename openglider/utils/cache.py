@@ -1,6 +1,14 @@
 from __future__ import annotations
+import collections
+import contextlib
 import copy
-import logging
+import functools
+import inspect
+import itertools
+import operator
+import sys
+import time
+import weakref
 from typing import TypeVar
 
 import numpy as np
@@ -9,8 +17,55 @@ import openglider
 
 cache_instances = []
 
+# global, monotonically increasing version stamps: no two modifications ever
+# share a stamp, so comparing stamps replaces hashing the attributes
+_version_counter = itertools.count(1)
+# bumped by clear_cache() to invalidate every cached value at once
+_cache_epoch = 0
 
-class CachedObject(object):
+_immutable_types = (type(None), bool, int, float, complex, str, bytes)
+
+# module-level LRUCache instances, emptied by clear_cache()
+_lru_caches = weakref.WeakSet()
+
+# active CacheStatistics collectors (see cache_statistics), empty -> no instrumentation
+_statistics_collectors = []
+
+
+def next_version() -> int:
+    return next(_version_counter)
+
+
+class VersionedObject(object):
+    """
+    An object carrying a version stamp which is renewed on every attribute-assignment.
+    Cached values store the stamps they were computed from instead of a hash.
+    """
+
+    _version = 0
+    _untracked_attributes = frozenset(["_cache", "cached_functions", "_version"])
+
+    def __setattr__(self, key, value):
+        object.__setattr__(self, key, value)
+        if key not in self._untracked_attributes:
+            object.__setattr__(self, "_version", next(_version_counter))
+
+    def _get_version(self):
+        return self._version
+
+    def __getstate__(self):
+        # caches and stamps are only valid within this process (and object)
+        state = self.__dict__.copy()
+        for key in self._untracked_attributes:
+            state.pop(key, None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.__dict__["_version"] = next(_version_counter)
+
+
+class CachedObject(VersionedObject):
     """
     An object to provide cached properties and functions.
     Provide a list of attributes to hash down for tracking changes
@@ -21,7 +76,7 @@ class CachedObject(object):
     cached_properties = []
 
     def __hash__(self):
-        return hash_attributes(self, self.hashlist)
+        return hash(self._get_version())
 
     def __del__(self):
         for prop in self.cached_properties:
@@ -34,6 +89,103 @@ class CachedObject(object):
             rep = rep[:-1] + ': "{}">'.format(self.name)
         return rep
 
+    def _get_version(self):
+        # own assignments + (in-place) changes of the tracked members
+        return (self._version,) + version_attributes(self, self.hashlist)
+
+
+def get_version(obj):
+    """
+    Get a cheap comparable key for the state of an object:
+        - version-stamp for tracked objects (HashedList, Rib, Cell, Line, Node,..)
+        - the value itself for immutable types
+        - the content for numpy arrays (function arguments) and lists
+        - the hash for everything else
+    Array-attributes of a hashlist are compared by identity (see version_getters)
+    """
+    if isinstance(obj, VersionedObject):
+        return obj._get_version()
+    elif isinstance(obj, _immutable_types):
+        return obj
+    elif isinstance(obj, np.ndarray):
+        # arguments are usually new arrays, compare by content
+        return (obj.dtype.str, obj.shape, obj.tobytes())
+    elif isinstance(obj, (list, tuple)):
+        return tuple(get_version(el) for el in obj)
+
+    return hash_list(obj)
+
+
+class _Identity(object):
+    """
+    Comparable by identity, keeps the object alive (no reuse of its id)
+    """
+
+    __slots__ = ("obj",)
+
+    def __init__(self, obj):
+        self.obj = obj
+
+    def __eq__(self, other):
+        return isinstance(other, _Identity) and self.obj is other.obj
+
+    def __hash__(self):
+        return id(self.obj)
+
+
+def attribute_version(owner, value):
+    """
+    Version of an attribute-value of owner.
+    Arrays are not compared by content but by identity and the stamp of the owner:
+    (augmented) assignments renew the stamp, so in-place changes of an array-attribute
+    have to re-assign it (obj.vec *= 2 / obj.vec = new_vec).
+    """
+    if isinstance(value, np.ndarray):
+        return _Identity(value), getattr(owner, "_version", None)
+
+    return get_version(value)
+
+
+def version_attributes(class_instance, hashlist):
+    getters = version_getters(tuple(hashlist))
+    return tuple(getter(class_instance) for getter in getters)
+
+
+def _get_self(obj):
+    return obj
+
+
+def _version_getter(attribute):
+    if attribute == "self":
+        return get_version
+
+    path, _, name = attribute.rpartition(".")
+    get_owner = operator.attrgetter(path) if path else _get_self
+
+    def get_attribute_version(obj):
+        owner = get_owner(obj)
+        return attribute_version(owner, getattr(owner, name))
+
+    return get_attribute_version
+
+
+@functools.lru_cache(maxsize=None)
+def version_getters(hashlist):
+    """
+    Precompiled getters for the versions of the attributes in a hashlist
+    """
+    return tuple(_version_getter(attribute) for attribute in hashlist)
+
+
+def attribute_getters(hashlist):
+    """
+    Precompiled (recursive) attribute-getters for a hashlist
+    """
+    return tuple(
+        _get_self if attribute == "self" else operator.attrgetter(attribute)
+        for attribute in hashlist
+    )
+
 
 def cached_property(*hashlist):
     # @functools.wraps
@@ -45,83 +197,529 @@ def cached_property(*hashlist):
             self.__module__ = fget.__module__
 
             self.hashlist = hashlist
+            self.getters = version_getters(hashlist)
 
             global cache_instances
             cache_instances.append(self)
 
+        def __deepcopy__(self, memo):
+            return self
+
         def __get__(self, parentclass, type=None):
+            if parentclass is None:
+                return self
+
+            if _statistics_collectors:
+                return self._get_recorded(parentclass)
+
             if not openglider.config["caching"]:
                 return self.function(parentclass)
             else:
-                if not hasattr(parentclass, "_cache"):
-                    parentclass._cache = {}
+                cache = parentclass.__dict__.get("_cache", None)
+                if cache is None:
+                    cache = parentclass.__dict__["_cache"] = PropertyCache()
+
+                version = tuple(
+                    [getter(parentclass) for getter in self.getters]
+                )
+                entry = cache.data.get(self, None)
+                # Return cached or recalc if versions differ
+                if entry is None or entry[0] != _cache_epoch or entry[1] != version:
+                    entry = (_cache_epoch, version, self.function(parentclass))
+                    cache.insert(self, entry)
+                else:
+                    cache_budget.touch(cache, self)
+
+                return entry[2]
+
+        def _get_recorded(self, parentclass):
+            """Same as __get__ but record hits, misses and timings"""
+            name = statistics_name(self.function)
+            start = time.perf_counter()
 
-                cache = parentclass._cache
-                dahash = hash_attributes(parentclass, self.hashlist)
-                # Return cached or recalc if hashes differ
-                if self not in cache or cache[self]["hash"] != dahash:
-                    res = self.function(parentclass)
-                    cache[self] = {"hash": dahash, "value": res}
+            if not openglider.config["caching"]:
+                value = self.function(parentclass)
+                record_statistics(name, False, 0.0, time.perf_counter() - start)
+                return value
+
+            cache = parentclass.__dict__.get("_cache", None)
+            if cache is None:
+                cache = parentclass.__dict__["_cache"] = PropertyCache()
+
+            version = tuple(
+                [getter(parentclass) for getter in self.getters]
+            )
+            entry = cache.data.get(self, None)
+            checked = time.perf_counter()
+
+            if entry is None or entry[0] != _cache_epoch or entry[1] != version:
+                entry = (_cache_epoch, version, self.function(parentclass))
+                record_statistics(
+                    name, False, checked - start, time.perf_counter() - checked
+                )
+                cache.insert(self, entry)
+            else:
+                cache_budget.touch(cache, self)
+                record_statistics(name, True, checked - start, 0.0)
 
-                return cache[self]["value"]
+            return entry[2]
 
     return CachedProperty
 
 
-def cached_function(*hashlist):
+def estimate_size(obj, depth=4, _seen=None) -> int:
+    """
+    Rough estimate of the memory [bytes] held by a (cached) value.
+    Numpy buffers are counted exactly, containers and objects recursively.
+    """
+    if _seen is None:
+        _seen = set()
+    if id(obj) in _seen:
+        return 0
+    _seen.add(id(obj))
+
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes + 112
+    elif isinstance(obj, HashedList):
+        return obj.data.nbytes + 112 + 64
+    elif isinstance(obj, _immutable_types):
+        return sys.getsizeof(obj)
+
+    size = sys.getsizeof(obj)
+    if depth > 0:
+        if isinstance(obj, dict):
+            for key, value in obj.items():
+                size += estimate_size(value, depth - 1, _seen)
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            for value in obj:
+                size += estimate_size(value, depth - 1, _seen)
+        elif hasattr(obj, "__dict__"):
+            size += estimate_size(obj.__dict__, depth - 1, _seen)
+
+    return size
+
+
+class CacheBudget(object):
+    """
+    Process-wide bookkeeping of all cached properties and function-caches.
+    Evicts the least recently used entries (of any cache) once the limits from
+    openglider.config (cache_max_entries / cache_max_bytes) are exceeded.
+    """
+
+    def __init__(self):
+        self.entries = collections.OrderedDict()  # (cache_ref, key) -> nbytes
+        self.keys = {}  # cache_ref -> set of keys
+        self.nbytes = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def add(self, cache, key, nbytes):
+        self.entries[cache.ref, key] = nbytes
+        self.keys.setdefault(cache.ref, set()).add(key)
+        self.nbytes += nbytes
+
+        self.enforce_limits()
+
+    def touch(self, cache, key):
+        self.entries.move_to_end((cache.ref, key))
+
+    def remove(self, cache, key):
+        self.nbytes -= self.entries.pop((cache.ref, key))
+        self.keys[cache.ref].discard(key)
+
+    def remove_cache(self, ref):
+        for key in self.keys.pop(ref, ()):
+            self.nbytes -= self.entries.pop((ref, key))
+
+    def clear(self):
+        for ref in list(self.keys):
+            cache = ref()
+            if cache is not None:
+                cache.clear()
+
+    def enforce_limits(self):
+        max_entries = openglider.config["cache_max_entries"]
+        max_bytes = openglider.config["cache_max_bytes"]
+
+        while self.entries and (
+            (max_entries is not None and len(self.entries) > max_entries)
+            or (max_bytes is not None and self.nbytes > max_bytes)
+        ):
+            ref, key = next(iter(self.entries))
+            cache = ref()
+            if cache is None:
+                self.remove_cache(ref)
+            else:
+                cache.evict(key)
+
+
+cache_budget = CacheBudget()
+
+
+class PropertyCache(object):
+    """
+    Cached properties of an instance: {CachedProperty: (epoch, version, value)}.
+    Every entry is registered with the cache_budget.
+    """
+
+    def __init__(self):
+        self.data = {}
+        self.ref = weakref.ref(self, cache_budget.remove_cache)
+
+    def __len__(self):
+        return len(self.data)
+
+    def __contains__(self, prop):
+        return prop in self.data
+
+    def __deepcopy__(self, memo):
+        # copies start with an empty cache
+        return self.__class__()
+
+    def __reduce__(self):
+        return self.__class__, ()
+
+    def insert(self, prop, entry):
+        if prop in self.data:
+            self.evict(prop)
+        self.data[prop] = entry
+        cache_budget.add(self, prop, estimate_size(entry[2]))
+
+    def evict(self, prop):
+        if _statistics_collectors:
+            record_eviction(statistics_name(prop.function))
+
+        self.data.pop(prop)
+        if (self.ref, prop) in cache_budget.entries:
+            cache_budget.remove(self, prop)
+
+    def clear(self):
+        for prop in list(self.data):
+            self.evict(prop)
+
+
+class LRUCache(object):
+    """
+    Bounded mapping for shared caches which are not bound to an instance
+    (basis-matrices, solvers). The least recently used entry is dropped once
+    maxsize is exceeded; clear_cache() empties all of them.
+    """
+
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self.data = collections.OrderedDict()
+        _lru_caches.add(self)
+
+    def __len__(self):
+        return len(self.data)
+
+    def __contains__(self, key):
+        return key in self.data
+
+    def __getitem__(self, key):
+        value = self.data[key]
+        self.data.move_to_end(key)
+        return value
+
+    def __setitem__(self, key, value):
+        self.data[key] = value
+        self.data.move_to_end(key)
+        while len(self.data) > self.maxsize:
+            self.data.popitem(last=False)
+
+    def clear(self):
+        self.data.clear()
+
+
+class BoundCache(object):
+    """
+    Least-recently-used cache of a function bound to an instance.
+    The cache is cleared once the versions of the hashlist change.
+    """
+
+    def __init__(
+        self, parent, function, getters, maxsize=None, max_bytes=None, signature=None
+    ):
+        self.parent = parent
+        self.function = function
+        self.getters = getters
+        self.signature = signature or inspect.signature(function)
+        parameters = list(self.signature.parameters.values())[1:]
+        # without *args/**kwargs a call with all arguments given positionally is already normalized
+        self._num_arguments = None
+        if all(p.kind in (p.POSITIONAL_ONLY, p.POSITIONAL_OR_KEYWORD) for p in parameters):
+            self._num_arguments = len(parameters)
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+
+        self.cache = collections.OrderedDict()
+        self.sizes = {}
+        self.nbytes = 0
+        self.version = None
+        self.ref = weakref.ref(self, cache_budget.remove_cache)
+
+    def __repr__(self):
+        return f"<cached: {self.function}>"
+
+    def __len__(self):
+        return len(self.cache)
+
+    def __deepcopy__(self, memo):
+        # copies start with an empty cache
+        parent = copy.deepcopy(self.parent, memo)
+        return self.__class__(
+            parent,
+            self.function,
+            self.getters,
+            self.maxsize,
+            self.max_bytes,
+            self.signature,
+        )
+
+    def __call__(self, *args, **kwargs):
+        if _statistics_collectors:
+            return self._call_recorded(*args, **kwargs)
+
+        argument_key = self._get_key(args, kwargs)
+
+        if argument_key in self.cache:
+            self.cache.move_to_end(argument_key)
+            cache_budget.touch(self, argument_key)
+            return self.cache[argument_key]
+
+        value = self.function(self.parent, *args, **kwargs)
+        self.insert(argument_key, value)
+
+        return value
+
+    def _call_recorded(self, *args, **kwargs):
+        """Same as __call__ but record hits, misses and timings"""
+        name = statistics_name(self.function)
+        start = time.perf_counter()
+
+        argument_key = self._get_key(args, kwargs)
+        checked = time.perf_counter()
+
+        if argument_key in self.cache:
+            self.cache.move_to_end(argument_key)
+            cache_budget.touch(self, argument_key)
+            record_statistics(name, True, checked - start, 0.0)
+            return self.cache[argument_key]
+
+        value = self.function(self.parent, *args, **kwargs)
+        record_statistics(name, False, checked - start, time.perf_counter() - checked)
+        self.insert(argument_key, value)
+
+        return value
+
+    def _get_key(self, args, kwargs):
+        """
+        Get the key for the arguments, the cache is cleared if the hashlist changed
+        """
+        version = (_cache_epoch,) + tuple(
+            [getter(self.parent) for getter in self.getters]
+        )
+
+        if version != self.version:
+            self.clear()
+            self.version = version
+
+        if not kwargs and len(args) == self._num_arguments:
+            return get_version(args)
+
+        # f(10), f(numribs=10) and f() (with the default 10) share one entry
+        arguments = self.signature.bind(self.parent, *args, **kwargs)
+        arguments.apply_defaults()
+        values = []
+        for name, value in list(arguments.arguments.items())[1:]:
+            if self.signature.parameters[name].kind == inspect.Parameter.VAR_KEYWORD:
+                value = tuple(sorted(value.items()))
+            values.append(value)
+
+        return get_version(tuple(values))
+
+    def set(self, value, *args, **kwargs):
+        """
+        Store a result computed elsewhere (p.e. in another process) for the given arguments
+        """
+        argument_key = self._get_key(args, kwargs)
+        if argument_key in self.cache:
+            self.evict(argument_key)
+        self.insert(argument_key, value)
+
+    def insert(self, key, value):
+        nbytes = estimate_size(value)
+        self.cache[key] = value
+        self.sizes[key] = nbytes
+        self.nbytes += nbytes
+
+        while len(self.cache) > 1 and (
+            (self.maxsize is not None and len(self.cache) > self.maxsize)
+            or (self.max_bytes is not None and self.nbytes > self.max_bytes)
+        ):
+            self.evict(next(iter(self.cache)))
+
+        cache_budget.add(self, key, nbytes)
+
+    def evict(self, key):
+        if _statistics_collectors:
+            record_eviction(statistics_name(self.function))
+
+        self.cache.pop(key)
+        self.nbytes -= self.sizes.pop(key)
+        if (self.ref, key) in cache_budget.entries:
+            cache_budget.remove(self, key)
+
+    def clear(self):
+        for key in list(self.cache):
+            self.evict(key)
+
+
+def cached_function(*hashlist, maxsize=None, max_bytes=None):
+    """
+    Cache the results of a method per instance and arguments.
+
+    :param hashlist: attributes the results depend on
+    :param maxsize: maximum number of cached results per instance (least recently used are dropped)
+    :param max_bytes: maximum (estimated) memory of the cached results per instance
+    """
+
     class CachedFunction:
         def __init__(self, f_get, doc=None):
             self.function = f_get
             self.__doc__ = doc or f_get.__doc__
             self.__name__ = f_get.__name__
             self.__module__ = f_get.__module__
+            self.hashlist = hashlist
+            self.getters = version_getters(hashlist)
+            self.signature = inspect.signature(f_get)
+
+        def __deepcopy__(self, memo):
+            return self
 
         def __get__(self, instance, parentclass):
-            if not hasattr(instance, "cached_functions"):
-                setattr(instance, "cached_functions", {})
+            if instance is None:
+                return self
 
-            if self not in instance.cached_functions:
+            cached_functions = instance.__dict__.get("cached_functions", None)
+            if cached_functions is None:
+                cached_functions = instance.__dict__["cached_functions"] = {}
 
-                class BoundCache:
-                    def __init__(self, parent, function):
-                        self.parent = parent
-                        self.function = function
-                        self.cache = {}
-                        self.hash = None
-                        self.hashlist = hashlist
+            if self not in cached_functions:
+                cached_functions[self] = BoundCache(
+                    instance,
+                    self.function,
+                    self.getters,
+                    maxsize,
+                    max_bytes,
+                    self.signature,
+                )
 
-                    def __repr__(self):
-                        return f"<cached: {self.function}>"
+            return cached_functions[self]
 
-                    def __call__(self, *args, **kwargs):
-                        the_hash = hash_attributes(self.parent, self.hashlist)
-                        # logging.info(f"{self.parent} {the_hash} {self.hash} {args} {kwargs}")
+    return CachedFunction
 
-                        if the_hash != self.hash:
-                            self.cache.clear()
-                            self.hash = the_hash
 
-                        argument_hash = hash_list(*args, *kwargs.values())
-                        logging.debug(f"{argument_hash}, {str(args)}, {str(kwargs)}")
+def clear_cache():
+    """
+    Invalidate all cached values
+    """
+    global _cache_epoch
+    _cache_epoch += 1
+    cache_budget.clear()
+    for cache in list(_lru_caches):
+        cache.clear()
 
-                        if argument_hash not in self.cache:
-                            logging.debug(f"recalc, {self.function} {self.parent}")
-                            self.cache[argument_hash] = self.function(
-                                self.parent, *args, **kwargs
-                            )
 
-                        return self.cache[argument_hash]
+class CacheStatistics(object):
+    """
+    Hits, misses and timings [s] of all cached properties / functions.
+    Timings of nested cached values are included in the recompute-time of the caller.
+    """
 
-                instance.cached_functions[self] = BoundCache(instance, self.function)
+    fields = ("hits", "misses", "evictions", "check_time", "recompute_time")
 
-            return instance.cached_functions[self]
+    def __init__(self):
+        self.data = {}
 
-    return CachedFunction
+    def __repr__(self):
+        lines = [super(CacheStatistics, self).__repr__()]
+        for name, stats in self.get_report().items():
+            lines.append(
+                "    {}: {hits} hits / {misses} misses, {recompute_time:.4f}s".format(
+                    name, **stats
+                )
+            )
+        return "\n".join(lines)
+
+    def _get(self, name):
+        if name not in self.data:
+            self.data[name] = dict.fromkeys(self.fields, 0)
+        return self.data[name]
+
+    def record(self, name, hit, check_time, recompute_time):
+        stats = self._get(name)
+        if hit:
+            stats["hits"] += 1
+        else:
+            stats["misses"] += 1
+        stats["check_time"] += check_time
+        stats["recompute_time"] += recompute_time
 
+    def record_eviction(self, name):
+        self._get(name)["evictions"] += 1
 
-def clear_cache():
-    for instance in cache_instances:
-        instance.cache.clear()
+    def get_report(self, sort_by="recompute_time"):
+        """
+        :return: {name: {hits, misses, evictions, hit_rate, check_time, recompute_time}}
+        """
+        report = {}
+        for name, stats in self.data.items():
+            calls = stats["hits"] + stats["misses"]
+            report[name] = dict(stats, hit_rate=stats["hits"] / max(calls, 1))
+
+        items = sorted(report.items(), key=lambda item: -item[1][sort_by])
+        return dict(items)
+
+    def get_dataframe(self, sort_by="recompute_time"):
+        from openglider.utils.dataframe import from_records
+
+        return from_records(self.get_report(sort_by=sort_by), index="name")
+
+    def clear(self):
+        self.data.clear()
+
+
+@contextlib.contextmanager
+def cache_statistics():
+    """
+    Collect statistics of all cached properties / functions within the context:
+
+        with cache_statistics() as stats:
+            glider.get_glider_3d()
+        print(stats.get_report())
+    """
+    statistics = CacheStatistics()
+    _statistics_collectors.append(statistics)
+    try:
+        yield statistics
+    finally:
+        _statistics_collectors.remove(statistics)
+
+
+def statistics_name(function):
+    return f"{function.__module__}.{function.__qualname__}"
+
+
+def record_statistics(name, hit, check_time, recompute_time):
+    for statistics in _statistics_collectors:
+        statistics.record(name, hit, check_time, recompute_time)
+
+
+def record_eviction(name):
+    for statistics in _statistics_collectors:
+        statistics.record_eviction(name)
 
 
 def recursive_getattr(obj, attr):
@@ -137,42 +735,6 @@ def recursive_getattr(obj, attr):
         return recursive_getattr(getattr(obj, l[0]), ".".join(l[1:]))
 
 
-def c_mul(a, b):
-    """
-    C type multiplication
-    http://stackoverflow.com/questions/6008026/how-hash-is-implemented-in-python-3-2
-    """
-    return eval(hex((int(a) * b) & 0xFFFFFFFF)[:-1])
-
-
-def hash_attributes(class_instance, hashlist):
-    """
-    http://effbot.org/zone/python-hash.htm
-    """
-    value_lst = ()
-
-    for attribute in hashlist:
-        el = recursive_getattr(class_instance, attribute)
-
-        hash_func = getattr(el, "__hash__", None)
-        hash_func = None
-        if hash_func is not None:
-            thahash = el.__hash__()
-        else:
-            try:
-                thahash = hash(el)
-            except TypeError:  # Lists p.e.
-                # logging.warning(f"bad cache: {el} / {class_instance} / {attribute}, {type(el)}")
-                try:
-                    thahash = hash(frozenset(el))
-                except TypeError:
-                    thahash = hash(str(el))
-
-        value_lst += (thahash,)
-
-    return hash(value_lst)
-
-
 def hash_list(*lst):
     value_lst = ()
     for el in lst:
@@ -204,10 +766,14 @@ class HashedList(CachedObject):
 
     name = "unnamed"
 
-    def __init__(self, data, name=None):
+    # only changes of the data invalidate the cache (see data.setter);
+    # writes to the array itself (self.data[i] = ...) go through __setitem__
+    __setattr__ = object.__setattr__
+
+    def __init__(self, data, name=None, copy=True):
         self._data = np.array([])
         self._hash = None
-        self.data = data
+        self.set_data(data, copy=copy)
         self.name = name or getattr(self, "name", None)
 
     def __json__(self):
@@ -221,11 +787,13 @@ class HashedList(CachedObject):
     def __setitem__(self, key, value):
         self.data[key] = np.array(value)
         self._hash = None
+        self._version = next(_version_counter)
 
     def __hash__(self):
         if self._hash is None:
-            self._hash = hash(str(self.data))
-            # self._hash = hash("{}/{}".format(id(self), time.time()))
+            # hash the raw buffer: str() truncates large arrays
+            data = self._data
+            self._hash = hash((data.dtype.str, data.shape, data.tobytes()))
         return self._hash
 
     def __len__(self):
@@ -247,14 +815,26 @@ class HashedList(CachedObject):
 
     @data.setter
     def data(self, data):
-        if data is not None:
+        self.set_data(data)
+
+    def set_data(self, data, copy=True):
+        """
+        :param data: list of points or ndarray
+        :param copy: if False, an ndarray is used as it is (no copy)
+        """
+        if data is None:
+            self._data = np.array([])
+        elif isinstance(data, np.ndarray):
+            self._data = np.array(data) if copy else np.asarray(data)
+        else:
             data = list(data)  # np.array(zip(x,y)) is shit
             self._data = np.array(data)
-            # self._data = np.array(data)
-            # self._data = [np.array(vector) for vector in data]  # 1,5*execution time
-            self._hash = None
-        else:
-            self._data = np.array([])
+
+        self._hash = None
+        self._version = next(_version_counter)
+
+    def _get_version(self):
+        return self._version
 
     def copy(self: T) -> T:
         return copy.deepcopy(self)
@@ -15,3 +15,12 @@ def apply_df(df):
     for obj_dict in objs_dict:
         obj = obj_dict.pop("obj")
         # apply the attributes?
+
+
+def from_records(records, index=None):
+    """
+    Create a DataFrame from a dict of records: {index_value: {column: value}}
+    """
+    df = pd.DataFrame.from_dict(records, orient="index")
+    df.index.name = index
+    return df
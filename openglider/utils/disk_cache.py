@@ -0,0 +1,290 @@
+"""
+Optional persistent cache for expensive, numpy-heavy results.
+
+Entries are addressed by a content hash of the inputs (arrays are hashed by
+dtype, shape and raw bytes), so the same glider yields the same keys across
+processes and invocations. Every entry is a directory holding an
+``index.json`` describing the structure of the result and one ``.npy`` file
+per array.
+
+Arrays are read into memory on a hit: results are plain, writeable arrays,
+whether they were just computed or loaded from the cache.
+
+The cache is disabled unless ``openglider.config["disk_cache_path"]`` is set
+(defaults to the environment variable ``OPENGLIDER_DISK_CACHE``).
+"""
+from __future__ import annotations
+import functools
+import hashlib
+import inspect
+import json
+import logging
+import os
+import shutil
+import uuid
+
+import numpy as np
+
+import openglider
+from openglider.utils.cache import HashedList, attribute_getters, statistics_name
+
+logger = logging.getLogger(__name__)
+
+_index_file = "index.json"
+# returned by DiskCache.get for missing entries (None is a valid result)
+_missing = object()
+
+
+def content_hash(*objects) -> str:
+    """
+    Stable hex-digest of (nested) inputs: numbers, strings, arrays,
+    HashedLists, sequences, dicts and objects implementing __json__.
+    """
+    digest = hashlib.blake2b(digest_size=20)
+    for obj in objects:
+        _update_hash(digest, obj)
+    return digest.hexdigest()
+
+
+def _update_hash(digest, obj):
+    if obj is None or isinstance(obj, (bool, int, float, complex, str)):
+        digest.update(f"{type(obj).__name__}:{obj!r};".encode())
+    elif isinstance(obj, bytes):
+        digest.update(b"bytes:%d;" % len(obj))
+        digest.update(obj)
+    elif isinstance(obj, np.generic):
+        _update_hash(digest, obj.item())
+    elif isinstance(obj, np.ndarray):
+        if obj.dtype.hasobject:
+            _update_hash(digest, obj.tolist())
+        else:
+            digest.update(f"array:{obj.dtype.str}:{obj.shape};".encode())
+            digest.update(np.ascontiguousarray(obj).data)
+    elif isinstance(obj, HashedList):
+        digest.update(f"{type(obj).__qualname__}:".encode())
+        _update_hash(digest, obj.data)
+    elif isinstance(obj, (list, tuple)):
+        digest.update(f"{type(obj).__name__}:{len(obj)}[".encode())
+        for value in obj:
+            _update_hash(digest, value)
+        digest.update(b"]")
+    elif isinstance(obj, dict):
+        digest.update(f"dict:{len(obj)}{{".encode())
+        for key in sorted(obj, key=repr):
+            _update_hash(digest, key)
+            _update_hash(digest, obj[key])
+        digest.update(b"}")
+    elif hasattr(obj, "__json__"):
+        digest.update(f"{type(obj).__module__}.{type(obj).__qualname__}:".encode())
+        _update_hash(digest, obj.__json__())
+    else:
+        raise TypeError(f"Can't compute a content hash for {obj!r}")
+
+
+class DiskCache(object):
+    """
+    Content-addressed store on disk with a size-limit (least recently used
+    entries are removed first). Safe to share between processes: entries are
+    written to a temporary directory and renamed into place.
+    """
+
+    def __init__(self, path, max_bytes=None):
+        self.path = os.path.abspath(path)
+        self.max_bytes = max_bytes
+        os.makedirs(self.path, exist_ok=True)
+
+    def __repr__(self):
+        return f"<DiskCache {self.path}>"
+
+    def __contains__(self, key):
+        return os.path.isfile(os.path.join(self.path, key, _index_file))
+
+    def get(self, key, default=None):
+        entry = os.path.join(self.path, key)
+        index_path = os.path.join(entry, _index_file)
+        try:
+            with open(index_path) as index_file:
+                index = json.load(index_file)
+            value = self._unpack(index, entry)
+        except FileNotFoundError:
+            return default
+        except Exception:
+            logger.warning(f"dropping unreadable disk-cache entry {entry}", exc_info=True)
+            shutil.rmtree(entry, ignore_errors=True)
+            return default
+
+        try:
+            os.utime(index_path)  # mark as recently used
+        except OSError:
+            pass
+
+        return value
+
+    def set(self, key, value):
+        arrays = []
+        index = self._pack(value, arrays)
+
+        tmp_dir = os.path.join(self.path, f".tmp-{uuid.uuid4().hex}")
+        os.makedirs(tmp_dir)
+        try:
+            for i, array in enumerate(arrays):
+                np.save(os.path.join(tmp_dir, f"{i}.npy"), array, allow_pickle=False)
+            # the index is written last: an entry is complete once it exists
+            with open(os.path.join(tmp_dir, _index_file), "w") as index_file:
+                json.dump(index, index_file)
+            os.rename(tmp_dir, os.path.join(self.path, key))
+        except OSError:
+            # another process stored the same entry in the meantime
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+        self.enforce_limit()
+
+    def remove(self, key):
+        shutil.rmtree(os.path.join(self.path, key), ignore_errors=True)
+
+    def clear(self):
+        for key, _, _ in self.entries():
+            self.remove(key)
+
+    def entries(self):
+        """
+        :return: list of (key, last_used, nbytes) for all complete entries
+        """
+        entries = []
+        with os.scandir(self.path) as it:
+            for entry in it:
+                if entry.name.startswith(".") or not entry.is_dir():
+                    continue
+                try:
+                    last_used = os.stat(os.path.join(entry.path, _index_file)).st_mtime
+                    nbytes = sum(f.stat().st_size for f in os.scandir(entry.path))
+                except OSError:
+                    continue
+                entries.append((entry.name, last_used, nbytes))
+
+        return entries
+
+    @property
+    def nbytes(self):
+        return sum(nbytes for _, _, nbytes in self.entries())
+
+    def enforce_limit(self):
+        if self.max_bytes is None:
+            return
+
+        entries = self.entries()
+        total = sum(nbytes for _, _, nbytes in entries)
+        entries.sort(key=lambda entry: entry[1])
+
+        # keep at least the newest entry
+        for key, _, nbytes in entries[:-1]:
+            if total <= self.max_bytes:
+                break
+            self.remove(key)
+            total -= nbytes
+
+    @classmethod
+    def _pack(cls, value, arrays):
+        if value is None or isinstance(value, (bool, int, float, str)):
+            return value
+        elif isinstance(value, np.generic):
+            return value.item()
+        elif isinstance(value, np.ndarray):
+            arrays.append(value)
+            return {"_array": len(arrays) - 1}
+        elif isinstance(value, HashedList):
+            return {
+                "_type": type(value).__qualname__,
+                "_module": type(value).__module__,
+                "data": cls._pack(value.data, arrays),
+                "name": value.name,
+            }
+        elif isinstance(value, (list, tuple)):
+            return {
+                "_" + type(value).__name__: [cls._pack(v, arrays) for v in value]
+            }
+        elif isinstance(value, dict) and all(isinstance(k, str) for k in value):
+            return {"_dict": {k: cls._pack(v, arrays) for k, v in value.items()}}
+        else:
+            raise TypeError(f"Can't store {value!r} in the disk cache")
+
+    @classmethod
+    def _unpack(cls, index, entry):
+        if not isinstance(index, dict):
+            return index
+        elif "_array" in index:
+            path = os.path.join(entry, "{}.npy".format(index["_array"]))
+            # no memory-map: hits and misses return the same (writeable) arrays
+            return np.load(path, allow_pickle=False)
+        elif "_type" in index:
+            hashed_list_cls = openglider.jsonify.get_element(
+                index["_module"], index["_type"]
+            )
+            return hashed_list_cls(cls._unpack(index["data"], entry), name=index["name"])
+        elif "_list" in index:
+            return [cls._unpack(v, entry) for v in index["_list"]]
+        elif "_tuple" in index:
+            return tuple(cls._unpack(v, entry) for v in index["_tuple"])
+        else:
+            return {k: cls._unpack(v, entry) for k, v in index["_dict"].items()}
+
+
+_disk_cache = None
+
+
+def get_disk_cache():
+    """
+    :return: the DiskCache configured in openglider.config or None if disabled
+    """
+    global _disk_cache
+    path = openglider.config["disk_cache_path"]
+    if not path:
+        return None
+
+    if _disk_cache is None or _disk_cache.path != os.path.abspath(path):
+        _disk_cache = DiskCache(path)
+    _disk_cache.max_bytes = openglider.config["disk_cache_max_bytes"]
+
+    return _disk_cache
+
+
+def disk_cached(*hashlist):
+    """
+    Persist the results of a method in the disk-cache (if enabled).
+    The key is a content hash of the attributes in the hashlist,
+    the arguments and the openglider version.
+    Use below cached_function to keep results in memory as well.
+    """
+    getters = attribute_getters(hashlist)
+
+    def decorator(function):
+        name = statistics_name(function)
+        signature = inspect.signature(function)
+
+        @functools.wraps(function)
+        def wrapper(self, *args, **kwargs):
+            disk_cache = get_disk_cache()
+            if disk_cache is None:
+                return function(self, *args, **kwargs)
+
+            arguments = signature.bind(self, *args, **kwargs)
+            arguments.apply_defaults()
+            arguments = list(arguments.arguments.items())[1:]
+
+            key = content_hash(
+                name,
+                openglider.__version__,
+                [getter(self) for getter in getters],
+                arguments,
+            )
+
+            result = disk_cache.get(key, _missing)
+            if result is _missing:
+                result = function(self, *args, **kwargs)
+                disk_cache.set(key, result)
+
+            return result
+
+        return wrapper
+
+    return decorator
@@ -45,6 +45,17 @@ def rangefrom(maxl, startpoint=0):
         j += 1
 
 
+def rangefrom_sorted(indices, startpoint=0):
+    """
+    sort indices the same way rangefrom() yields them (surrounding a startpoint)
+    """
+    indices = np.asarray(indices, dtype=int)
+    distance = np.abs(indices - startpoint)
+    # rangefrom yields startpoint + j before startpoint - j
+    key = 2 * distance - (indices > startpoint)
+    return indices[np.argsort(key, kind="stable")]
+
+
 def rotation_3d(angle, axis=None):
     """
     3D-Rotation Matrix for (angle[rad],[axis(x,y,z)])
@@ -83,6 +94,25 @@ def cut(p1, p2, p3, p4):
     return p1 + k * (p2 - p1), k, l
 
 
+def cut_lines(p1, p2, p3, p4):
+    """
+    Vectorized 2D-Linear Cut (see cut) for arrays of points (broadcasted)
+    Returns (points, k, l) with nan-values for parallel lines
+    """
+    p1, p2, p3, p4 = (np.asarray(p, dtype=float) for p in (p1, p2, p3, p4))
+    d1 = p2 - p1
+    d2 = p4 - p3
+    r = p3 - p1
+    denominator = d1[..., 0] * d2[..., 1] - d1[..., 1] * d2[..., 0]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        k = (r[..., 0] * d2[..., 1] - r[..., 1] * d2[..., 0]) / denominator
+        l = (r[..., 0] * d1[..., 1] - r[..., 1] * d1[..., 0]) / denominator
+    parallel = denominator == 0
+    k = np.where(parallel, np.nan, k)
+    l = np.where(parallel, np.nan, l)
+    return p1 + k[..., np.newaxis] * d1, k, l
+
+
 def set_dimension(array, dim=3):
     array = np.array(array)
     if len(array.shape) == 1:
@@ -1,3 +1,6 @@
+import numpy as np
+
+from openglider.utils.cache import cached_property
 from openglider.vector import PolyLine2D
 
 
@@ -6,7 +9,47 @@ class Interpolation(PolyLine2D):
         super(Interpolation, self).__init__(data, name)
         self.extrapolate = extrapolate
 
+    @cached_property("self")
+    def _xy_values(self):
+        """
+        x- and y-values as contiguous arrays, None if the x-values are not ascending
+        """
+        x_values = np.ascontiguousarray(self.data[:, 0], dtype=float)
+        y_values = np.ascontiguousarray(self.data[:, 1], dtype=float)
+        if np.any(x_values[1:] < x_values[:-1]):
+            return None
+        return x_values, y_values
+
     def __call__(self, xval):
+        """
+        Interpolate linearly for a value or an array of values
+        """
+        xy_values = self._xy_values
+        if xy_values is None:
+            if np.ndim(xval) > 0:
+                return np.array([self._call_unsorted(x) for x in np.ravel(xval)]).reshape(
+                    np.shape(xval)
+                )
+            return self._call_unsorted(xval)
+
+        x_values, y_values = xy_values
+        # index of the first point with point[0] > xval
+        index = np.searchsorted(x_values, xval, side="right")
+
+        if self.extrapolate:
+            index = np.clip(index, 1, len(x_values) - 1)
+        elif np.any((index <= 0) | (index >= len(x_values))) or np.any(
+            xval <= x_values[0]
+        ):
+            raise ValueError(f"Value {xval} not within the interpolation range")
+
+        x_1 = x_values[index - 1]
+        y_1 = y_values[index - 1]
+        d_x = x_values[index] - x_1
+
+        return y_1 + (xval - x_1) / d_x * (y_values[index] - y_1)
+
+    def _call_unsorted(self, xval):
         last_point = self.data[0]
         for index, point in enumerate(self.data):
             if index == 0:
@@ -5,25 +5,177 @@ from openglider.utils.cache import cached_property, HashedList
 from openglider.vector.functions import (
     norm,
     normalize,
-    rangefrom,
     rotation_2d,
     cut,
+    cut_lines,
+    rangefrom_sorted,
     radius_from_3points,
     curvature_from_3points,
 )
 from openglider.utils.table import Table
 
 
+def _normals_2d(vectors):
+    """
+    normalize and rotate an array of 2d-vectors (heading rhs)
+    """
+    lengths = np.linalg.norm(vectors, axis=1)
+    if not np.all(lengths > 0):
+        raise ValueError("Cannot normalize a vector of length 0")
+    normalized = vectors / lengths[:, np.newaxis]
+    return np.stack([normalized[:, 1], -normalized[:, 0]], axis=1)
+
+
+def _concatenated_ranges(start, counts):
+    """
+    concatenate range(start[i], start[i] + counts[i]) for all i
+    """
+    offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    return np.repeat(start, counts) + offsets
+
+
+class SegmentIndex(object):
+    """
+    Uniform grid over the bounding-boxes of the segments of a 2d-polyline.
+    Every cell lists the segments overlapping it, so the candidates for a cut
+    are found without testing every segment.
+    """
+
+    def __init__(self, bboxes, tolerance=1e-9):
+        self.num_segments = len(bboxes)
+        lower = bboxes[:, 0].min(axis=0)
+        upper = bboxes[:, 1].max(axis=0)
+        self.bounds = np.array([lower, upper])
+        self.margin = tolerance * (1 + np.abs(np.concatenate([lower, upper])).max())
+        self.origin = lower - self.margin
+        extent = upper + self.margin - self.origin
+        # about one segment per cell
+        self.cell_size = max(
+            np.sqrt(extent[0] * extent[1] / self.num_segments),
+            extent.max() / self.num_segments,
+        )
+        self.shape = np.maximum(np.ceil(extent / self.cell_size).astype(int), 1)
+
+        first, last = self._get_cell_range(bboxes[:, 0], bboxes[:, 1])
+        segments, cells = self._get_cells(first, last)
+        order = np.argsort(cells, kind="stable")
+        self.segments = segments[order]
+        self.cell_start = np.searchsorted(
+            cells[order], np.arange(self.shape[0] * self.shape[1] + 1)
+        )
+
+    @property
+    def bbox(self):
+        return np.array([self.origin, self.origin + self.shape * self.cell_size])
+
+    def _get_cell_range(self, lower, upper):
+        first = np.floor((lower - self.origin) / self.cell_size).astype(int)
+        last = np.floor((upper - self.origin) / self.cell_size).astype(int)
+        return np.clip(first, 0, self.shape - 1), np.clip(last, 0, self.shape - 1)
+
+    def _get_cells(self, first, last):
+        """
+        :return: owner, cell for every cell of the rectangles first..last
+        """
+        num_cols, num_rows = (last - first + 1).T
+        counts = num_cols * num_rows
+        owner = np.repeat(np.arange(len(first)), counts)
+        offsets = _concatenated_ranges(np.zeros(len(first), dtype=int), counts)
+        col = first[owner, 0] + offsets // num_rows[owner]
+        row = first[owner, 1] + offsets % num_rows[owner]
+        return owner, col * self.shape[1] + row
+
+    def _get_segments(self, owner, cells):
+        """
+        :return: (owner, segment) pairs for all segments listed in the cells
+        """
+        start = self.cell_start[cells]
+        counts = self.cell_start[cells + 1] - start
+        owner = np.repeat(owner, counts)
+        segments = self.segments[_concatenated_ranges(start, counts)]
+        pairs = np.unique(owner * self.num_segments + segments)
+        return np.divmod(pairs, self.num_segments)
+
+    def query_boxes(self, lower, upper):
+        """
+        Find the segments sharing a cell with some boxes
+        :return: (box index, segment index) arrays
+        """
+        bbox = self.bbox
+        inside = np.flatnonzero(
+            np.all((lower <= bbox[1] + self.margin) & (upper >= bbox[0] - self.margin), axis=1)
+        )
+        first, last = self._get_cell_range(lower[inside], upper[inside])
+        owner, cells = self._get_cells(first, last)
+        box, segments = self._get_segments(owner, cells)
+        return inside[box], segments
+
+    def query_line(self, p1, p2, tolerance=0):
+        """
+        Indices of all segments sharing a cell with the (infinite) line p1p2
+        or its surrounding within tolerance
+        """
+        x_1, y_1 = float(p1[0]), float(p1[1])
+        d_x, d_y = float(p2[0]) - x_1, float(p2[1]) - y_1
+        margin = max(self.margin, tolerance)
+        size = self.cell_size
+        (x_lower, y_lower), (x_upper, y_upper) = self.bbox.tolist()
+        num_cols, num_rows = self.shape.tolist()
+
+        # clip the line to the (widened) grid
+        t_min, t_max = -np.inf, np.inf
+        for start, direction, lower, upper in (
+            (x_1, d_x, x_lower - margin, x_upper + margin),
+            (y_1, d_y, y_lower - margin, y_upper + margin),
+        ):
+            if direction == 0:
+                if not lower <= start <= upper:
+                    return np.array([], dtype=int)
+            else:
+                t_1, t_2 = sorted([(lower - start) / direction, (upper - start) / direction])
+                t_min, t_max = max(t_min, t_1), min(t_max, t_2)
+        if t_min > t_max:
+            return np.array([], dtype=int)
+
+        x_min, x_max = sorted([x_1 + t_min * d_x, x_1 + t_max * d_x])
+        y_min, y_max = sorted([y_1 + t_min * d_y, y_1 + t_max * d_y])
+        col_first = min(max(int((x_min - margin - x_lower) // size), 0), num_cols - 1)
+        col_last = min(max(int((x_max + margin - x_lower) // size), 0), num_cols - 1)
+
+        segments = []
+        for col in range(col_first, col_last + 1):
+            # y-range of the line within the (widened) column
+            if d_x == 0:
+                y_a, y_b = y_min, y_max
+            else:
+                x_a = max(x_lower + col * size - margin, x_min)
+                x_b = min(x_lower + (col + 1) * size + margin, x_max)
+                y_a, y_b = sorted(
+                    [y_1 + (x_a - x_1) * d_y / d_x, y_1 + (x_b - x_1) * d_y / d_x]
+                )
+            row_first = min(max(int((y_a - margin - y_lower) // size), 0), num_rows - 1)
+            row_last = min(max(int((y_b + margin - y_lower) // size), 0), num_rows - 1)
+
+            cell = col * num_rows
+            first = self.cell_start[cell + row_first]
+            last = self.cell_start[cell + row_last + 1]
+            segments.append(self.segments[first:last])
+
+        return np.unique(np.concatenate(segments))
+
+
 class PolyLine(HashedList):
-    def __init__(self, data, name=None):
-        super(PolyLine, self).__init__(data, name)
+    def __init__(self, data, name=None, copy=True):
+        super(PolyLine, self).__init__(data, name, copy=copy)
 
     def __getitem__(self, ik):
         if isinstance(ik, int) and 0 <= ik < len(self):  # easiest case
             return self.data[ik]
         elif isinstance(ik, slice):  # example: list[1.2:5.5:1]
             values = self.get_positions(ik.start, ik.stop, ik.step)
-            return PolyLine([self[i] for i in values])
+            return PolyLine(self.get_points(values), copy=False)
+        elif isinstance(ik, np.ndarray):  # many points at once
+            return self.get_points(ik)
         else:
             if ik < 0:
                 k = ik
@@ -102,41 +254,62 @@ class PolyLine(HashedList):
         return values
 
     def check(self):
-        # remove zero-length segments
-        index = 0
-        while index < len(self) - 1:
-            if norm(self[index + 1] - self[index]) < 0.0000001:
-                self.data = np.concatenate([self[:index], self[index + 1 :]])
-            else:
-                index += 1
+        # remove zero-length segments (keep the later point)
+        if len(self) > 1:
+            keep = np.append(self.get_segment_lengthes() >= 0.0000001, True)
+            if not keep.all():
+                self.data = self.data[keep]
 
         return self
 
+    @cached_property("self")
+    def arc_lengths(self) -> np.ndarray:
+        """
+        Cumulated length at every point (starting with 0)
+        """
+        lengths = np.zeros(len(self.data))
+        np.cumsum(self.get_segment_lengthes(), out=lengths[1:])
+        return lengths
+
+    def get_arc_length(self, ik):
+        """
+        Length from the start to a (fractional) index,
+        extrapolated along the first/last segment
+        """
+        ik = np.asarray(ik, dtype=float)
+        arc_lengths = self.arc_lengths
+        i = np.clip(np.floor(ik).astype(int), 0, len(arc_lengths) - 2)
+        segment_lengths = arc_lengths[i + 1] - arc_lengths[i]
+        return arc_lengths[i] + (ik - i) * segment_lengths
+
+    def get_ik(self, length):
+        """
+        Inverse of get_arc_length: (fractional) index at a given length from the start
+        """
+        length = np.asarray(length, dtype=float)
+        arc_lengths = self.arc_lengths
+        i = np.searchsorted(arc_lengths, length, side="right") - 1
+        i = np.clip(i, 0, len(arc_lengths) - 2)
+        segment_lengths = arc_lengths[i + 1] - arc_lengths[i]
+        k = np.divide(
+            length - arc_lengths[i],
+            segment_lengths,
+            out=np.zeros_like(segment_lengths),
+            where=segment_lengths > 0,
+        )
+        return i + k
+
     def walk(self, start, length):
         """
         Move from a starting point for a given length in direction of the line
         TODO: rename -> walk(start, distance)
         """
-        if length == 0:
-            return start
-        direction = sign(length)
-        length = abs(length)
-        next_value = start - start % 1 + (direction > 0)
-        difference = norm(self[start] - self[next_value])
-        length -= difference
-        #
-        while length > 0:
-            if (next_value > len(self) and direction > 0) or (
-                next_value < 0 and direction < 0
-            ):
-                break
-            start = next_value
-            next_value += direction
-            difference = norm(self[next_value] - self[start])
-            length -= difference
-            # Length is smaller than zero
-        length = length
-        return next_value + direction * length * abs(next_value - start) / difference
+        if np.ndim(start) == 0 and np.ndim(length) == 0:
+            if length == 0:
+                return start
+            return float(self.get_ik(self.get_arc_length(start) + length))
+
+        return self.get_ik(self.get_arc_length(start) + length)
 
     def resample(self, num_points):
         """
@@ -144,16 +317,26 @@ class PolyLine(HashedList):
         That means to start from 0 and then move length/(num_points-1)
         """
         length = self.get_length()
-        ik = 0
-        distance = length / (num_points - 1)
-        data = [self[0]]
-        for i in range(1, num_points - 1):
-            ik = self.walk(ik, distance)
-            data.append(self[ik])
+        iks = self.get_ik(np.linspace(0, length, num_points)[1:-1])
+        iks = np.concatenate([[0], iks, [len(self) - 1]])
 
-        data.append(self[len(self) - 1])
+        return self.__class__(self.get_points(iks))
 
-        return self.__class__(data)
+    def get_points(self, iks):
+        """
+        Get points for an array of (fractional) indices,
+        extrapolated along the first/last segment (same as __getitem__)
+        :return: array of shape iks.shape + (dim,)
+        """
+        data = self.data
+        iks = np.asarray(iks, dtype=float)
+        last = len(data) - 1
+        i = np.clip(np.floor(iks).astype(int), 0, last - 1)
+        k = (iks - i)[..., np.newaxis]
+        points = data[i] + k * (data[i + 1] - data[i])
+        # the last point is returned exactly, as for integer indices
+        points[iks == last] = data[last]
+        return points
 
     def get_length(self, first=0, second=None):
         """
@@ -161,24 +344,10 @@ class PolyLine(HashedList):
         """
         if second is None:
             second = len(self) - 1
-        direction = sign(float(second - first))
-        length = 0
-        next_value = int(first - first % 1 + (direction > 0))
-        # Just to fasten up
-        if next_value > len(self) and direction < 0:
-            next_value = len(self)
-        elif next_value < 0 < direction:
-            next_value = 0
-        while next_value * direction < second * direction:
-            length += norm(self[next_value] - self[first])
-            first = next_value
-            next_value += direction
-            # Fasten up as well
-            if (next_value > len(self) and direction > 0) or (
-                next_value < 0 and direction < 0
-            ):
-                break
-        return length + norm(self[second] - self[first])
+        length = np.abs(self.get_arc_length(second) - self.get_arc_length(first))
+        if np.ndim(length) == 0:
+            return float(length)
+        return length
 
     def get_segment_lengthes(self) -> np.ndarray:
         return np.linalg.norm(self.get_segments(), axis=1)
@@ -193,8 +362,7 @@ class PolyLine(HashedList):
         scale ==  0: [0 , 1]
         scale == -1: [-1, 1]
         """
-        diff = self.get_segment_lengthes()
-        length = np.array([0] + np.cumsum(diff).tolist())
+        length = self.arc_lengths.copy()
         if scale in [0, -1]:
             length /= max(length)
             if scale == -1:
@@ -256,6 +424,10 @@ class PolyLine(HashedList):
         return self
 
 
+# shorter lines are cut without the segment_index
+_indexed_min_points = 500
+
+
 class PolyLine2D(PolyLine):
     def __add__(self, other):  # this is python default behaviour for lists
         if other.__class__ is self.__class__:
@@ -275,9 +447,53 @@ class PolyLine2D(PolyLine):
     def __getitem__(self, ik):
         res = super(PolyLine2D, self).__getitem__(ik)
         if isinstance(ik, slice):
-            return PolyLine2D(res.data)
+            return PolyLine2D(res.data, copy=False)
         return res
 
+    @cached_property("self")
+    def segment_bboxes(self) -> np.ndarray:
+        """
+        Bounding-boxes of all segments: [[x_min, y_min], [x_max, y_max]]
+        """
+        data = self.data
+        return np.stack(
+            [np.minimum(data[:-1], data[1:]), np.maximum(data[:-1], data[1:])], axis=1
+        )
+
+    @cached_property("self")
+    def segment_index(self) -> SegmentIndex:
+        """
+        Grid of the segments bounding-boxes to prune cut candidates
+        """
+        return SegmentIndex(self.segment_bboxes)
+
+    def get_cut_candidates(self, p1, p2):
+        """
+        Indices of segments possibly crossing the (infinite) line p1p2:
+        the endpoints lie on different sides (with some tolerance)
+        """
+        p1 = np.asarray(p1, dtype=float)
+        direction = np.asarray(p2, dtype=float) - p1
+        data = self.data
+        if len(self) > _indexed_min_points:
+            index = self.segment_index
+            # same as the maximum distance of all points (per axis)
+            scale = 1 + np.abs(index.bounds - p1).max()
+            segments = index.query_line(p1, p2, 2e-8 * scale)
+        else:
+            scale = 1 + np.abs(data - p1).max(initial=0)
+            segments = np.arange(len(self) - 1)
+        tolerance = 1e-8 * norm(direction) * scale
+
+        relative_1 = data[segments] - p1
+        relative_2 = data[segments + 1] - p1
+        side_1 = direction[0] * relative_1[:, 1] - direction[1] * relative_1[:, 0]
+        side_2 = direction[0] * relative_2[:, 1] - direction[1] * relative_2[:, 0]
+        candidates = (np.minimum(side_1, side_2) <= tolerance) & (
+            np.maximum(side_1, side_2) >= -tolerance
+        )
+        return segments[candidates]
+
     def cut(self, p1, p2, startpoint=0, extrapolate=False, cut_only_positive=False):
         """
         Iterate over all cuts with the line p1p2
@@ -288,7 +504,18 @@ class PolyLine2D(PolyLine):
         # TODO: we have some float issues, check if we were slightly above 1 before and are slightly
         # below 0 now -> on the point
         startpoint = int(startpoint)
-        for i in rangefrom(len(self) - 1, startpoint):
+        if len(self) < 2:
+            return
+
+        candidates = self.get_cut_candidates(p1, p2)
+        if extrapolate:
+            candidates = np.union1d(candidates, [0, len(self) - 2])
+        # negative startpoints also check the extension of the first segment
+        indices = list(range(startpoint + 1, 0)) + list(
+            rangefrom_sorted(candidates, startpoint)
+        )
+
+        for i in indices:
             try:
                 # (x,y), i, k
                 pos, ik1, ik2 = cut(self[i], self[i + 1], p1, p2)
@@ -305,37 +532,135 @@ class PolyLine2D(PolyLine):
                 continue
 
     def cut_with_polyline(self, pl, startpoint=0):
-        for i, (p1, p2) in enumerate(zip(pl[:-1], pl[1:])):
-            l = norm(p2 - p1)
-            for ik1, k2 in self.cut(p1, p2, startpoint, cut_only_positive=True):
-                ik2 = i + (norm(self[ik1] - p1) / l)
-                yield ik1, ik2
+        """
+        Iterate over all intersections with the segments of another polyline,
+        ordered by the segments of pl and (per segment) around the startpoint
+
+        yield ik (self), ik (pl)
+        """
+        ik_self, ik_other = self.get_intersections(pl)
+        segment_self = np.minimum(np.floor(ik_self), len(self) - 2)
+        segment_other = np.minimum(np.floor(ik_other), len(pl) - 2)
+        # same order as rangefrom_sorted
+        distance = np.abs(segment_self - int(startpoint))
+        order = np.lexsort((2 * distance - (segment_self > startpoint), segment_other))
+
+        for i in order:
+            yield ik_self[i], ik_other[i]
+
+    def get_intersections(self, other):
+        """
+        Get all intersections of the segments with the segments of another line
+        (vectorized, pruned by the segment_index)
+        :return: ik_self, ik_other (arrays sorted by ik_self)
+        """
+        if len(self) < 2 or len(other) < 2:
+            return np.array([]), np.array([])
+
+        bbox = other.segment_bboxes
+        j, i = self.segment_index.query_boxes(bbox[:, 0], bbox[:, 1])
+
+        _, k, l = cut_lines(
+            self.data[i], self.data[i + 1], other.data[j], other.data[j + 1]
+        )
+        # segments are half-open, except the last one
+        k_max = np.where(i == len(self) - 2, 1, np.nextafter(1, 0))
+        l_max = np.where(j == len(other) - 2, 1, np.nextafter(1, 0))
+        hit = (0 <= k) & (k <= k_max) & (0 <= l) & (l <= l_max)
+
+        ik_self = i[hit] + k[hit]
+        ik_other = j[hit] + l[hit]
+        order = np.argsort(ik_self, kind="stable")
+
+        return ik_self[order], ik_other[order]
 
-    def check(self):  # TODO: IMPROVE (len = len(self.data), len-=,...)
+    def check(self):
         """
         Check for mistakes in the array, such as for the moment: self-cuttings,..
+        Every loop (segment i cutting a later segment j) is replaced by the cut-point
         """
         super(PolyLine2D, self).check()
-        for i in range(len(self.data) - 3):
-            if i > len(self.data) - 4:
-                break
-            for j in range(i + 2, len(self.data) - 2):
-                if j > len(self.data) - 3:
+        data = self.data
+        candidates = self._get_self_cut_candidates(data)
+        if not candidates:
+            return self
+
+        # walk the segments in the original indexing: after a cut (i, j) the
+        # remaining part of segment j (starting at the cut-point) is checked
+        # against the later segments. The last segment is never checked.
+        last = len(data) - 2
+        points = []
+        start = data[0]
+        i = 0
+        while i < len(data) - 1:
+            cut_point = None
+            for j in candidates.get(i, []):
+                if j >= last:
                     break
                 try:
-                    temp = cut(
-                        self.data[i], self.data[i + 1], self.data[j], self.data[j + 1]
-                    )
-                    if 0 < temp[1] < 1.0 and 0 < temp[2] < 1.0:
-                        # self.data = self.data[:i] + [temp[0]] + self.data[j + 1:]
-                        self.data = np.concatenate(
-                            [self.data[:i], [temp[0]], self.data[j + 1 :]]
-                        )
-                except np.linalg.linalg.LinAlgError:
+                    temp = cut(start, data[i + 1], data[j], data[j + 1])
+                except np.linalg.LinAlgError:
                     continue
+                if 0 < temp[1] < 1.0 and 0 < temp[2] < 1.0:
+                    cut_point = temp[0]
+                    break
+
+            if cut_point is None:
+                points.append(start)
+                i += 1
+                start = data[i]
+            else:
+                start = cut_point
+                i = j
+
+        points.append(start)
+        if len(points) < len(data):
+            self.data = np.array(points)
 
         return self
 
+    @staticmethod
+    def _get_self_cut_candidates(data, tolerance=1e-9):
+        """
+        Sweep over the segments sorted by x to find pairs (i, j>i+1) of segments which
+        might cut each other (overlapping bounding-boxes and close cut parameters)
+        :return: {i: sorted list of j}
+        """
+        num_segments = len(data) - 1
+        if num_segments < 3:
+            return {}
+
+        lower = np.minimum(data[:-1], data[1:]) - tolerance
+        upper = np.maximum(data[:-1], data[1:]) + tolerance
+
+        # sweep: every segment is compared to the following ones (in x-order)
+        # with a starting x-value smaller than its end
+        order = np.argsort(lower[:, 0], kind="stable")
+        x_start = lower[order, 0]
+        first = np.arange(1, num_segments)
+        last = np.searchsorted(x_start, upper[order[:-1], 0], side="right")
+        counts = np.maximum(last - first, 0)
+        if not counts.sum():
+            return {}
+        a = np.repeat(order[:-1], counts)
+        offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        b = order[np.repeat(first, counts) + offsets]
+
+        i = np.minimum(a, b)
+        j = np.maximum(a, b)
+        overlap = (lower[j, 1] <= upper[i, 1]) & (lower[i, 1] <= upper[j, 1])
+        overlap &= j >= i + 2
+        i, j = i[overlap], j[overlap]
+
+        _, k, l = cut_lines(data[i], data[i + 1], data[j], data[j + 1])
+        close = (k > -tolerance) & (k < 1 + tolerance) & (l > -tolerance) & (l < 1 + tolerance)
+
+        candidates = {}
+        for i_, j_ in sorted(zip(i[close].tolist(), j[close].tolist())):
+            candidates.setdefault(i_, []).append(j_)
+
+        return candidates
+
     @cached_property("self")
     def normvectors(self):  # RENAME: norm_point_vectors?
         """
@@ -343,22 +668,16 @@ class PolyLine2D(PolyLine):
         this property returns a normal for every point,
         approximated by the 2 neighbour points (len(data) == len(normals))
         """
-        rotate = lambda x: normalize(x).dot([[0, -1], [1, 0]])
-        normvectors = [rotate(self.data[1] - self.data[0])]
-        for j in range(1, len(self.data) - 1):
-            normvectors.append(
-                # rotate(normalize(self.data[j + 1] - self.data[j]) + normalize(self.data[j] - self.data[j - 1])))
-                rotate(self.data[j + 1] - self.data[j - 1])
-            )
-        normvectors.append(rotate(self.data[-1] - self.data[-2]))
-        return normvectors
+        data = self.data
+        directions = np.concatenate(
+            [data[1:2] - data[:1], data[2:] - data[:-2], data[-1:] - data[-2:-1]]
+        )
+        return _normals_2d(directions)
 
     @cached_property("self")
     def tangents(self):
-        tangents = []
-        for p1, p2 in self.segments:
-            tangents.append((p2 - p1) / norm(p2 - p1))
-        return np.array(tangents)
+        segments = self.get_segments()
+        return segments / np.linalg.norm(segments, axis=1)[:, np.newaxis]
 
     @cached_property("self")
     def norm_segment_vectors(self):
@@ -366,11 +685,7 @@ class PolyLine2D(PolyLine):
         return all the normals based on the segments of the data:
         len(data) - 1 == len(normals)
         """
-        rotate = lambda x: normalize(x).dot([[0, -1], [1, 0]])
-        normvectors = []
-        for p1, p2 in self.segments:
-            normvectors.append(rotate(normalize(p2 - p1)))
-        return np.array(normvectors)
+        return _normals_2d(self.get_segments())
 
     def get_normal(self, ik):
         """get normal-vector by ik-value"""
@@ -406,38 +721,50 @@ class PolyLine2D(PolyLine):
         """
         Shift the whole line for a given amount (->Sewing allowance)
         """
-        # cos(vectorangle(a,b)) = (a1 b1+a2 b2)/Sqrt[(a1^2+a2^2) (b1^2+b2^2)]
-        newlist = []
-        second = self.data[0]
-        third = self.data[1]
-        newlist.append(second + self.norm_segment_vectors[0] * amount)
-        for i in range(1, len(self.data) - 1):
-            first = second
-            second = third
-            third = self.data[i + 1]
-            d1 = second - first
-            d2 = third - second
-            cosphi = d1.dot(d2) / np.sqrt(d1.dot(d1) * d2.dot(d2))
-            coresize = 1e-8
-            if cosphi > 0.9999 or norm(d1) < coresize or norm(d2) < coresize:
-                newlist.append(second + self.normvectors[i] * amount / cosphi)
-            elif cosphi < -0.9999:  # this is true if the direction changes 180 degree
-                n1 = self.norm_segment_vectors[i - 1]
-                n2 = self.norm_segment_vectors[i]
-                newlist.append(second + self.norm_segment_vectors[i - 1] * amount)
-                newlist.append(second + self.norm_segment_vectors[i] * amount)
-            else:
-                n1 = self.norm_segment_vectors[i - 1]
-                n2 = self.norm_segment_vectors[i]
-                sign = -1.0 + 2.0 * (d2.dot(n1) > 0)
-                phi = np.arccos(n1.dot(n2))
-                d1 = normalize(d1)
-                ext_vec = n1 - sign * d1 * np.tan(phi / 2)
-                newlist.append(second + ext_vec * amount)
-
-                # newlist.append(cut(a, b, c, d)[0])
-        newlist.append(third + self.norm_segment_vectors[-1] * amount)
-        self.data = newlist
+        data = self.data
+        segment_normals = self.norm_segment_vectors
+        n1 = segment_normals[:-1]
+        n2 = segment_normals[1:]
+        points = data[1:-1]
+
+        d1 = data[1:-1] - data[:-2]
+        d2 = data[2:] - data[1:-1]
+        l1 = np.linalg.norm(d1, axis=1)
+        l2 = np.linalg.norm(d2, axis=1)
+        coresize = 1e-8
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            # cos(vectorangle(a,b)) = (a1 b1+a2 b2)/Sqrt[(a1^2+a2^2) (b1^2+b2^2)]
+            cosphi = np.sum(d1 * d2, axis=1) / np.sqrt(
+                np.sum(d1 * d1, axis=1) * np.sum(d2 * d2, axis=1)
+            )
+            straight = (cosphi > 0.9999) | (l1 < coresize) | (l2 < coresize)
+            # the direction changes 180 degree -> two points
+            reverse = ~straight & (cosphi < -0.9999)
+
+            # miter: extend the first normal to the bisector
+            sign = np.where(np.sum(d2 * n1, axis=1) > 0, 1.0, -1.0)
+            phi = np.arccos(np.sum(n1 * n2, axis=1))
+            ext_vec = n1 - (sign * np.tan(phi / 2))[:, np.newaxis] * (
+                d1 / l1[:, np.newaxis]
+            )
+            ext_straight = self.normvectors[1:-1] / cosphi[:, np.newaxis]
+
+        inner = points + np.where(straight[:, np.newaxis], ext_straight, ext_vec) * amount
+
+        counts = 1 + reverse
+        position = np.cumsum(counts) - counts
+        inner = np.repeat(inner, counts, axis=0)
+        inner[position[reverse]] = points[reverse] + n1[reverse] * amount
+        inner[position[reverse] + 1] = points[reverse] + n2[reverse] * amount
+
+        self.data = np.concatenate(
+            [
+                data[:1] + segment_normals[:1] * amount,
+                inner,
+                data[-1:] + segment_normals[-1:] * amount,
+            ]
+        )
 
         return self
 
@@ -20,14 +20,73 @@
 from __future__ import division
 
 import numpy as np
+import scipy.linalg
 
-from openglider.utils.cache import HashedList
-from openglider.vector import norm, Interpolation
+from openglider.utils.cache import HashedList, LRUCache, cached_function
+from openglider.vector import Interpolation
 from openglider.vector.transformation import Reflection
 from openglider.utils import dualmethod
 
 
+class LeastSquaresFit(object):
+    """
+    Solve min|A.u-b| for the controlpoints u, with some of them given (fixed).
+    The factorization of A is done once and reused for every right-hand side.
+    """
+
+    def __init__(self, matrix, fixed=()):
+        num_ctrl = matrix.shape[1]
+        self.num_ctrl = num_ctrl
+        self.fixed = list(fixed)
+        self.free = [i for i in range(num_ctrl) if i not in self.fixed]
+        self.matrix_fixed = matrix[:, self.fixed]
+
+        matrix_free = matrix[:, self.free]
+        self.pinv = None
+        if matrix_free.shape[0] >= matrix_free.shape[1]:
+            self.q, self.r = np.linalg.qr(matrix_free)
+            if np.any(np.abs(np.diag(self.r)) < 1e-12):
+                self.pinv = np.linalg.pinv(matrix_free)
+        else:
+            self.pinv = np.linalg.pinv(matrix_free)
+
+    def solve(self, points, fixed_values):
+        """
+        :param points: samples (num_samples) or (num_samples x dim)
+        :param fixed_values: values of the fixed controlpoints
+        :return: controlpoints (num_ctrl) or (num_ctrl x dim)
+        """
+        points = np.asarray(points, dtype=float)
+        fixed_values = np.asarray(fixed_values, dtype=float)
+        result = np.zeros((self.num_ctrl,) + points.shape[1:])
+
+        if self.fixed:
+            points = points - self.matrix_fixed.dot(fixed_values)
+            result[self.fixed] = fixed_values
+
+        if self.free:
+            if self.pinv is not None:
+                result[self.free] = self.pinv.dot(points)
+            else:
+                result[self.free] = scipy.linalg.solve_triangular(
+                    self.r, self.q.T.dot(points)
+                )
+
+        return result
+
+
+_fit_solvers = LRUCache(maxsize=64)
+# base-matrices for arrays of parameters, see Bezier.get_shared_matrix
+_base_matrices = LRUCache(maxsize=64)
+
+# nodes and weights for the arc-length quadrature
+_gauss_legendre = np.polynomial.legendre.leggauss(8)
+
+
 class _BernsteinFactory:
+    # basis-matrices for equidistant samples, shared by all instances
+    matrices = LRUCache(maxsize=64)
+
     def __init__(self):
         self.bases = {}
 
@@ -46,6 +105,44 @@ class _BernsteinFactory:
 
         return self.bases[degree]
 
+    def get_matrix(self, num_ctrl, values):
+        """
+        Evaluate all bernstein polynomials for an array of parameters at once
+        :return: matrix (len(values) x num_ctrl)
+        """
+        x = np.asarray(values, dtype=float)[:, np.newaxis]
+        n = np.arange(num_ctrl)
+        factors = np.array([choose(num_ctrl - 1, i) for i in n], dtype=float)
+        return factors * (x**n) * ((1 - x) ** (num_ctrl - 1 - n))
+
+    def get_derivative_matrix(self, num_ctrl, values):
+        """
+        Derivatives of all bernstein polynomials for an array of parameters
+        :return: matrix (len(values) x num_ctrl)
+        """
+        values = np.asarray(values, dtype=float)
+        derivative = np.zeros((len(values), num_ctrl))
+        if num_ctrl > 1:
+            lower = (num_ctrl - 1) * self.get_matrix(num_ctrl - 1, values)
+            derivative[:, 1:] += lower
+            derivative[:, :-1] -= lower
+        return derivative
+
+    def get_spans(self, num_ctrl):
+        return np.array([0.0, 1.0])
+
+    def get_sample_matrix(self, num_ctrl, num_samples):
+        """
+        Cached basis-matrix for num_samples equidistant values in [0, 1]
+        """
+        key = (num_ctrl, num_samples)
+        if key not in self.matrices:
+            matrix = self.get_matrix(num_ctrl, np.linspace(0, 1, num_samples))
+            matrix.flags.writeable = False
+            self.matrices[key] = matrix
+
+        return self.matrices[key]
+
     def __json__(self):
         return {}
 
@@ -59,6 +156,7 @@ BernsteinBase = _BernsteinFactory()
 
 class Bezier(HashedList):
     basefactory = BernsteinBase
+    length_tolerance = 1e-8
 
     def __init__(self, controlpoints=None):
         """
@@ -98,14 +196,19 @@ class Bezier(HashedList):
         return spline
 
     def __call__(self, value):
-        dim = len(self.data[0])
-        assert 0 <= value <= 1, "value must be in the range (0,1), not {}".format(value)
+        """
+        Get the point(s) for a parameter or an array of parameters in [0, 1]
+        """
+        values = np.asarray(value, dtype=float)
+        assert np.all(
+            (0 <= values) & (values <= 1)
+        ), "value must be in the range (0,1), not {}".format(value)
 
-        val = np.zeros(dim)
-        base = self.basefactory(len(self.data))
-        for i, point in enumerate(self.data):
-            val += point * base[i](value)
-        return val
+        if values.ndim == 0:
+            matrix = self.get_base_matrix(len(self.data), values[np.newaxis])
+            return matrix.dot(self.data)[0]
+
+        return self.get_shared_matrix(len(self.data), values).dot(self.data)
 
     @property
     def numpoints(self):
@@ -117,11 +220,11 @@ class Bezier(HashedList):
     @numpoints.setter
     def numpoints(self, num_ctrl, num_points=50):
         if not num_ctrl == self.numpoints:
-            data = [self(i) for i in np.linspace(0, 1, num_points)]
+            data = self(np.linspace(0, 1, num_points))
             self.fit(data, num_ctrl)
 
     def change_base(self, base, num_points=50):
-        data = [self(i) for i in np.linspace(0, 1, num_points)]
+        data = self(np.linspace(0, 1, num_points))
         self.basefactory = base
         self._matrix = None
         self.fit(data, self.numpoints)
@@ -140,54 +243,12 @@ class Bezier(HashedList):
         Fit to a given set of points with a certain number of spline-points (default=3)
         if start (/ end) is True, the first (/ last) point of the Curve is included
         """
-        base = self.basefactory(numpoints)
-        matrix = np.matrix(
-            [
-                [
-                    base[column](row * 1.0 / (len(points) - 1))
-                    for column in range(len(base))
-                ]
-                for row in range(len(points))
-            ]
-        )
+        points = np.asarray(points, dtype=float)
+        fixed = [0] * bool(start) + [numpoints - 1] * bool(end)
+        fixed_values = points[[0] * bool(start) + [-1] * bool(end)]
 
-        if not start and not end:
-            matrix = np.linalg.pinv(matrix)
-            out = np.array(matrix * points)
-            return out
-        else:
-            A1 = np.array(matrix)
-            A2 = []
-            points2 = []
-            points1 = np.array(points)
-            solution = []
-
-            if start:
-                # add first column to A2 and remove first column of A1
-                A2.append(A1[:, 0])
-                A1 = A1[:, 1:]
-                points2.append(points[0])
-                points1 = points1[1:]
-
-            if end:
-                # add last column to A2 and remove last column of A1
-                A2.append(A1[:, -1])
-                A1 = A1[:, :-1]
-                points2.append(points[-1])
-                points1 = points[:-1]
-            A1_inv = np.linalg.inv(np.dot(A1.T, A1))
-            A2 = np.array(A2).T
-            points1 = np.array(points).T
-            points2 = np.array(points2).T
-            for dim, point in enumerate(points1):
-                rhs1 = np.array(A1.T.dot(point))
-                rhs2 = np.array((A1.T.dot(A2)).dot(points2[dim])).T
-                solution.append(np.array(A1_inv.dot(rhs1 - rhs2)))
-            solution = np.matrix(solution).T.tolist()
-            if start:
-                solution.insert(0, points[0])
-            if end:
-                solution.append(points[-1])
+        solver = self.get_fit_solver(numpoints, len(points), fixed)
+        solution = solver.solve(points, fixed_values)
 
         if type(self) == type:  # classmethod
             return self(solution)
@@ -204,38 +265,44 @@ class Bezier(HashedList):
         # all points have same dimension
         dim = len(constraint[0])
         num_ctrl_pts = len(constraint)
-
-        # create the base matrix:
-        base = self.basefactory(num_ctrl_pts)
-        matrix = np.array(
-            [
-                [
-                    base[column](row * 1.0 / (len(points) - 1))
-                    for column in range(len(base))
-                ]
-                for row in range(len(points))
-            ]
-        )
-
-        # create the b vector for each dim
-        b = np.array(list(zip(*points)))
+        points = np.asarray(points, dtype=float)
 
         # fit
-        solution = []
-        constraints_T = list(zip(*constraint))
+        solution = np.zeros((num_ctrl_pts, dim))
         for i in range(dim):
-            constraints = [
-                [index, val]
-                for index, val in enumerate(constraints_T[i])
-                if val != None
-            ]
-            solution.append(self.constraint_least_square_sol(matrix, b[i], constraints))
+            fixed = [index for index, row in enumerate(constraint) if row[i] != None]
+            fixed_values = np.array(
+                [constraint[index][i] for index in fixed], dtype=float
+            )
+            solver = self.get_fit_solver(num_ctrl_pts, len(points), fixed)
+            solution[:, i] = solver.solve(points[:, i], fixed_values)
+
         if type(self) == type:
-            return self(np.array(solution).transpose())
+            return self(solution)
         else:
-            self.controlpoints = np.array(solution).transpose()
+            self.controlpoints = solution
             return self
 
+    @dualmethod
+    def get_fit_solver(self, num_ctrl, num_samples, fixed=()):
+        """
+        Least-squares solver for fitting num_samples equidistant points with num_ctrl
+        controlpoints, where the controlpoints at the indices "fixed" are given.
+        Cached per base, so fitting the same topology costs one factorization.
+        """
+        base = self.basefactory
+        if hasattr(base, "get_matrix"):
+            degree = getattr(base, "degree", None)
+            key = (type(base), degree, num_ctrl, num_samples, tuple(fixed))
+            if key not in _fit_solvers:
+                values = np.arange(num_samples) / (num_samples - 1)
+                matrix = base.get_matrix(num_ctrl, values)
+                _fit_solvers[key] = LeastSquaresFit(matrix, fixed)
+            return _fit_solvers[key]
+
+        values = np.arange(num_samples) / (num_samples - 1)
+        return LeastSquaresFit(self.get_base_matrix(num_ctrl, values), fixed)
+
     @staticmethod
     def constraint_least_square_sol(A, b, constraint):
         """return u for minimized |A.u-b| with u containing the constraint points.
@@ -273,16 +340,51 @@ class Bezier(HashedList):
 
     def get_matrix(self, num=50):
         num_points = len(self._data)
-        if self._matrix is not None and self._matrix.shape == (num, num_points):
+        if hasattr(self.basefactory, "get_sample_matrix"):
+            # shared by all curves with the same base
+            self._matrix = self.basefactory.get_sample_matrix(num_points, num)
+            return self._matrix
+        elif self._matrix is not None and self._matrix.shape == (num, num_points):
             return self._matrix
         else:
-            self._matrix = np.ndarray([num, num_points])
-            functions = self.basefactory(num_points)
-            for row, value in enumerate(np.linspace(0, 1, num)):
-                for col, foo in enumerate(functions):
-                    self._matrix[row, col] = foo(value)
+            self._matrix = self.get_base_matrix(num_points, np.linspace(0, 1, num))
             return self._matrix
 
+    @dualmethod
+    def get_shared_matrix(self, num_ctrl, values):
+        """
+        Base-matrix for an array of parameters, cached and shared by all curves
+        with the same base (and degree)
+        """
+        base = self.basefactory
+        if not hasattr(base, "get_matrix"):
+            return self.get_base_matrix(num_ctrl, values)
+
+        values = np.ascontiguousarray(values, dtype=float)
+        degree = getattr(base, "degree", None)
+        key = (type(base), degree, num_ctrl, values.shape, values.tobytes())
+        if key not in _base_matrices:
+            matrix = self.get_base_matrix(num_ctrl, values)
+            matrix.flags.writeable = False
+            _base_matrices[key] = matrix
+
+        return _base_matrices[key]
+
+    @dualmethod
+    def get_base_matrix(self, num_ctrl, values):
+        """
+        Values of all basis-functions: matrix (len(values) x num_ctrl)
+        """
+        if hasattr(self.basefactory, "get_matrix"):
+            return self.basefactory.get_matrix(num_ctrl, values)
+
+        functions = self.basefactory(num_ctrl)
+        matrix = np.ndarray([len(values), num_ctrl])
+        for row, value in enumerate(values):
+            for col, foo in enumerate(functions):
+                matrix[row, col] = foo(value)
+        return matrix
+
     def get_sequence(self, num=None):
         if num is None:
             if self._matrix is not None:
@@ -291,19 +393,142 @@ class Bezier(HashedList):
                 num = 50  # default
         return np.dot(self.get_matrix(num), self._data)
 
-    def get_length(self, num):
-        seq = self.get_sequence(num=num)
-        out = 0.0
-        for i, s in enumerate(seq[1:]):
-            out += norm(s - seq[i])
-        return out
+    def get_derivative(self, value):
+        """
+        Get the derivative(s) for a parameter or an array of parameters in [0, 1]
+        """
+        values = np.asarray(value, dtype=float)
+        matrix = self.get_derivative_base_matrix(len(self.data), np.atleast_1d(values))
+        derivatives = matrix.dot(self.data)
+        if values.ndim == 0:
+            return derivatives[0]
+        return derivatives
+
+    @dualmethod
+    def get_derivative_base_matrix(self, num_ctrl, values):
+        """
+        Derivatives of all basis-functions: matrix (len(values) x num_ctrl)
+        """
+        if hasattr(self.basefactory, "get_derivative_matrix"):
+            return self.basefactory.get_derivative_matrix(num_ctrl, values)
+
+        # central differences
+        values = np.asarray(values, dtype=float)
+        step = 1e-6
+        upper = np.minimum(values + step, 1)
+        lower = np.maximum(values - step, 0)
+        difference = self.get_base_matrix(num_ctrl, upper) - self.get_base_matrix(
+            num_ctrl, lower
+        )
+        return difference / (upper - lower)[:, np.newaxis]
+
+    def get_length(self, num=None, tolerance=None):
+        """
+        Length of the curve. Sum of the segment-lengths for num sampled points or,
+        if num is not given, integrated up to a relative tolerance.
+        """
+        if num is not None:
+            seq = self.get_sequence(num=num)
+            return np.linalg.norm(np.diff(seq, axis=0), axis=1).sum()
+
+        _, lengths = self.get_length_table(tolerance or self.length_tolerance)
+        return lengths[-1]
+
+    @cached_function("self", "basefactory", maxsize=4)
+    def get_length_table(self, tolerance):
+        """
+        Inverse arc-length table: parameters and arc-lengths at these parameters.
+        Every knot span is integrated with gauss-legendre quadrature and bisected
+        until the halves change the length less than the tolerance (relative).
+        """
+        if hasattr(self.basefactory, "get_spans"):
+            breakpoints = self.basefactory.get_spans(len(self.data))
+        else:
+            breakpoints = np.array([0.0, 1.0])
+
+        lengths = self._integrate_speed(breakpoints[:-1], breakpoints[1:])
+
+        for _ in range(30):
+            starts = breakpoints[:-1]
+            midpoints = (starts + breakpoints[1:]) / 2
+            left = self._integrate_speed(starts, midpoints)
+            right = self._integrate_speed(midpoints, breakpoints[1:])
+            refined = left + right
+
+            bisect = np.abs(refined - lengths) > tolerance * refined.sum()
+            if not np.any(bisect):
+                lengths = refined
+                break
+
+            # replace the bisected spans with their halves
+            order = np.argsort(np.concatenate([starts, midpoints[bisect]]), kind="stable")
+            breakpoints = np.append(
+                np.concatenate([starts, midpoints[bisect]])[order], breakpoints[-1]
+            )
+            lengths = np.concatenate(
+                [np.where(bisect, left, refined), right[bisect]]
+            )[order]
+
+        return breakpoints, np.concatenate([[0.0], np.cumsum(lengths)])
+
+    def _integrate_speed(self, start, end):
+        """
+        Arc-length between arrays of parameters (gauss-legendre quadrature)
+        """
+        nodes, weights = _gauss_legendre
+        half = (np.asarray(end) - start) / 2
+        values = (np.asarray(start) + half)[:, np.newaxis] + half[:, np.newaxis] * nodes
+        derivatives = self.get_derivative(values.ravel())
+        speed = np.linalg.norm(derivatives, axis=1).reshape(values.shape)
+        return half * speed.dot(weights)
+
+    def parameter_at_length(self, length, tolerance=None):
+        """
+        Parameter(s) for an arc-length or an array of arc-lengths (clipped to the curve).
+        """
+        tolerance = tolerance or self.length_tolerance
+        breakpoints, lengths = self.get_length_table(tolerance)
+        target = np.clip(np.asarray(length, dtype=float), 0, lengths[-1])
+        flat_target = np.atleast_1d(target).ravel()
+
+        index = np.searchsorted(lengths, flat_target, side="right") - 1
+        index = np.clip(index, 0, len(breakpoints) - 2)
+        start = breakpoints[index]
+        end = breakpoints[index + 1]
+        offset = flat_target - lengths[index]
+        span_length = lengths[index + 1] - lengths[index]
+
+        # linear guess, refined by newton-iterations
+        with np.errstate(divide="ignore", invalid="ignore"):
+            parameters = np.where(
+                span_length > 0, start + offset / span_length * (end - start), start
+            )
+        for _ in range(10):
+            error = self._integrate_speed(start, parameters) - offset
+            if np.all(np.abs(error) <= tolerance * lengths[-1]):
+                break
+            speed = np.linalg.norm(self.get_derivative(parameters), axis=1)
+            step = np.divide(error, speed, out=np.zeros_like(error), where=speed > 0)
+            parameters = np.clip(parameters - step, start, end)
+
+        if target.ndim == 0:
+            return parameters[0]
+        return parameters.reshape(target.shape)
+
+    def sample_equidistant(self, num, tolerance=None):
+        """
+        num points with equal arc-length distances (including start and end)
+        """
+        length = self.get_length(tolerance=tolerance)
+        parameters = self.parameter_at_length(np.linspace(0, length, num), tolerance)
+        return self(np.clip(parameters, 0, 1))
 
 
 class SymmetricBezier(Bezier):
     def __init__(self, controlpoints=None, mirror=None):
         self._mirror = mirror or Reflection([1.0, 0.0, 0.0])
         super(SymmetricBezier, self).__init__(controlpoints=None)
-        if controlpoints:
+        if controlpoints is not None:
             self.controlpoints = controlpoints
 
     # @classmethod
@@ -329,8 +554,8 @@ class SymmetricBezier(Bezier):
     @numpoints.setter
     def numpoints(self, num_ctrl, num_points=50):
         if not num_ctrl == self.numpoints:
-            data = [self(i) for i in np.linspace(0, 1, num_points)]
-            self.fit(np.array(data), num_ctrl)
+            data = self(np.linspace(0, 1, num_points))
+            self.fit(data, num_ctrl)
 
     @dualmethod
     def fit(cls, data, numpoints=3, start=True, end=True):
@@ -1,14 +1,20 @@
+import numpy as np
+
 from openglider.vector.spline.bezier import Bezier, SymmetricBezier
 from openglider.utils import dualmethod
+from openglider.utils.cache import LRUCache
 
 
 class BSplineBase:
+    # basis-matrices for equidistant samples, shared by all bases of the same type and degree
+    matrices = LRUCache(maxsize=64)
+
     def __init__(self, degree=3):
         self.degree = degree
         self.bases = {}
 
     def __call__(self, numpoints):  # number of controlpoints
-        if numpoints not in self.bases and True:
+        if numpoints not in self.bases:
             knots = self.make_knot_vector(self.degree, numpoints)
             basis = [self.get_basis(self.degree, i, knots) for i in range(numpoints)]
             self.bases[numpoints] = basis
@@ -58,6 +64,97 @@ class BSplineBase:
 
         return basis_function
 
+    def get_matrix(self, num_ctrl, values):
+        """
+        Evaluate all basis functions for an array of parameters at once (Cox-de Boor).
+        Same values as the functions returned by get_basis.
+        :return: matrix (len(values) x num_ctrl)
+        """
+        t = np.asarray(values, dtype=float)[:, np.newaxis]
+        knots = np.array(self.make_knot_vector(self.degree, num_ctrl))
+        at_start = t[:, 0] == 0
+
+        # degree 0: t_this < t <= t_next
+        basis = ((knots[1:] >= t) & (t > knots[:-1])).astype(float)
+
+        return self._raise_degree(basis, knots, t, range(1, self.degree + 1), at_start)
+
+    def get_derivative_matrix(self, num_ctrl, values):
+        """
+        Derivatives of all basis functions for an array of parameters
+        :return: matrix (len(values) x num_ctrl)
+        """
+        t = np.asarray(values, dtype=float)[:, np.newaxis]
+        degree = self.degree
+        if degree == 0:
+            return np.zeros((len(t), num_ctrl))
+
+        knots = np.array(self.make_knot_vector(degree, num_ctrl))
+
+        # degree 0, the first non-empty span is closed at the start
+        basis = (knots[1:] >= t) & (t > knots[:-1])
+        first_span = np.argmax(knots[1:] > knots[0])
+        basis[t[:, 0] <= knots[0], first_span] = True
+
+        # num_ctrl + 1 basis functions of degree - 1
+        lower = self._raise_degree(basis.astype(float), knots, t, range(1, degree))
+
+        with np.errstate(divide="ignore"):
+            left = knots[degree : num_ctrl + degree] - knots[:num_ctrl]
+            left = np.where(left != 0, degree / left, 0.0)
+            right = knots[degree + 1 : num_ctrl + degree + 1] - knots[1 : num_ctrl + 1]
+            right = np.where(right != 0, degree / right, 0.0)
+
+        return left * lower[:, :num_ctrl] - right * lower[:, 1 : num_ctrl + 1]
+
+    def get_spans(self, num_ctrl):
+        """
+        Boundaries of the (non-empty) knot spans
+        """
+        return np.unique(self.make_knot_vector(self.degree, num_ctrl))
+
+    @staticmethod
+    def _raise_degree(basis, knots, t, degrees, at_start=None):
+        """
+        Cox-de Boor recursion from the basis of degree (degrees[0] - 1)
+        """
+        for degree in degrees:
+            num = len(knots) - degree - 1
+            t_this = knots[:num]
+            t_next = knots[1 : num + 1]
+            t_precog = knots[degree : num + degree]
+            t_horizon = knots[degree + 1 : num + degree + 1]
+
+            with np.errstate(divide="ignore", invalid="ignore"):
+                left = np.where(
+                    t_precog != t_this,
+                    (t - t_this) / (t_precog - t_this) * basis[:, :num],
+                    0.0,
+                )
+                right = np.where(
+                    t_horizon != t_next,
+                    (t_horizon - t) / (t_horizon - t_next) * basis[:, 1 : num + 1],
+                    0.0,
+                )
+            basis = left + right
+            if at_start is not None:
+                basis[at_start, 0] = 1
+
+        return basis
+
+    def get_sample_matrix(self, num_ctrl, num_samples):
+        """
+        Cached basis-matrix for num_samples equidistant values in [0, 1]
+        """
+        # subclasses might use other knot-vectors
+        key = (type(self), self.degree, num_ctrl, num_samples)
+        if key not in self.matrices:
+            matrix = self.get_matrix(num_ctrl, np.linspace(0, 1, num_samples))
+            matrix.flags.writeable = False
+            self.matrices[key] = matrix
+
+        return self.matrices[key]
+
     def make_knot_vector(self, degree, num_points):
         """
         Create knot vectors
@@ -20,6 +20,8 @@
 import unittest
 import random
 
+import numpy as np
+
 from common import openglider
 from openglider.glider import ballooning
 
@@ -52,6 +54,23 @@ class TestBallooningBezier(unittest.TestCase):
         for x in x_values:
             self.assertAlmostEqual(b1[x]+b2[x], mixed[x], places=2)
 
+    def test_array(self):
+        x_values = np.linspace(-1, 1, 41)
+        values = self.ballooning[x_values]
+        phi = self.ballooning(x_values)
+        for x, value, phi_value in zip(x_values, values, phi):
+            self.assertAlmostEqual(value, self.ballooning[x])
+            self.assertAlmostEqual(phi_value, self.ballooning(x))
+        self.assertRaises(ValueError, self.ballooning.mapx, [0, 1.1])
+
+
+class TestArcSinc(unittest.TestCase):
+    def test_inverse(self):
+        phi = np.linspace(0.1, 3, 30)
+        result = ballooning.Ballooning.arcsinc(np.sinc(phi / np.pi))
+        self.assertTrue(np.allclose(result, phi, atol=1e-4))
+        self.assertAlmostEqual(ballooning.Ballooning.arcsinc(np.sinc(0.5 / np.pi)), 0.5, 4)
+
 
 if __name__ == '__main__':
     unittest.main(verbosity=2)
\ No newline at end of file
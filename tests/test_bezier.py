@@ -22,7 +22,11 @@ from __future__ import division
 import unittest
 import random
 
-from openglider.vector.spline import Bezier
+import numpy as np
+
+from openglider.utils.cache import clear_cache
+from openglider.vector.spline import Bezier, BSplineBase
+from openglider.vector.spline.bspline import BSpline3
 
 
 class TestBezier(unittest.TestCase):
@@ -35,6 +39,25 @@ class TestBezier(unittest.TestCase):
         self.assertAlmostEqual(self.bezier(val)[0], self.bezier(val)[0])
         self.assertAlmostEqual(self.bezier(val)[1], self.bezier(val)[1])
 
+    def test_call_array(self):
+        values = np.array([random.random() for _ in range(10)])
+        points = self.bezier(values)
+        self.assertEqual(points.shape, (10, 2))
+        for value, point in zip(values, points):
+            self.assertTrue(np.allclose(self.bezier(value), point))
+
+    def test_shared_matrix(self):
+        other = Bezier([[i, random.random()] for i in range(15)])
+        self.assertIs(self.bezier.get_matrix(30), other.get_matrix(30))
+
+    def test_shared_call_matrix(self):
+        values = np.linspace(0, 1, 17) ** 2
+        other = Bezier([[i, random.random()] for i in range(15)])
+        matrix = self.bezier.get_shared_matrix(15, values)
+        self.assertIs(matrix, other.get_shared_matrix(15, values.copy()))
+        self.assertTrue(np.allclose(self.bezier(values), matrix.dot(self.bezier.controlpoints)))
+        self.assertTrue(np.allclose(other(values)[3], other(values[3])))
+
     def test_fit(self):
         num = len(self.bezier.controlpoints)
         to_fit = self.bezier.get_sequence()
@@ -43,15 +66,113 @@ class TestBezier(unittest.TestCase):
             self.assertAlmostEqual(p1[0], p2[0], 0)
             self.assertAlmostEqual(p1[1], p2[1], 0)
 
+    def test_fit_pinned(self):
+        to_fit = self.bezier.get_sequence(40)
+        for start in (True, False):
+            for end in (True, False):
+                bezier2 = Bezier.fit(to_fit, len(self.bezier.controlpoints), start, end)
+                self.assertTrue(np.allclose(bezier2.controlpoints, self.bezier.controlpoints))
+
+    def test_fit_solver(self):
+        solver = Bezier.get_fit_solver(5, 30, [0, 4])
+        self.assertIs(solver, self.bezier.get_fit_solver(5, 30, [0, 4]))
+
+    def test_constraint_fit(self):
+        to_fit = self.bezier.get_sequence(40)
+        constraint = [[None, None]] * len(self.bezier.controlpoints)
+        constraint[0] = [-1., None]
+        bezier2 = Bezier.constraint_fit(to_fit, constraint)
+        self.assertEqual(bezier2.controlpoints[0][0], -1.)
+        self.assertAlmostEqual(bezier2.controlpoints[-1][1], self.bezier.controlpoints[-1][1], 5)
+
     def test_length(self):
         self.bezier.controlpoints = [[0, 0], [2, 0]]
         self.assertAlmostEqual(self.bezier.get_length(10), 2.)
 
+    def test_derivative(self):
+        values = np.linspace(0.01, 0.99, 20)
+        step = 1e-6
+        difference = (self.bezier(values + step) - self.bezier(values - step)) / (2 * step)
+        self.assertTrue(np.allclose(self.bezier.get_derivative(values), difference, atol=1e-4))
+
+    def test_length_quadrature(self):
+        length = self.bezier.get_length()
+        self.assertAlmostEqual(length, self.bezier.get_length(100000), 4)
+        self.assertIs(self.bezier.get_length_table(1e-8), self.bezier.get_length_table(1e-8))
+
+    def test_parameter_at_length(self):
+        length = self.bezier.get_length()
+        parameters = self.bezier.parameter_at_length(np.array([0, length / 3, length]))
+        self.assertEqual(parameters[0], 0)
+        self.assertAlmostEqual(parameters[2], 1)
+        partial = Bezier(self.bezier.controlpoints)
+        sequence = partial(np.linspace(0, parameters[1], 20000))
+        partial_length = np.linalg.norm(np.diff(sequence, axis=0), axis=1).sum()
+        self.assertAlmostEqual(partial_length, length / 3, 4)
+
+    def test_sample_equidistant(self):
+        line = Bezier([[0, 0], [0.1, 0], [2, 0]])
+        points = line.sample_equidistant(5)
+        self.assertTrue(np.allclose(points[:, 0], np.linspace(0, 2, 5)))
+
     def test_get_sequence(self):
         sequence = self.bezier.get_sequence(100)
         # print(sequence)
 
 
+class TestBSplineBase(unittest.TestCase):
+    def test_matrix(self):
+        for degree in range(4):
+            base = BSplineBase(degree)
+            values = [random.random() for _ in range(10)] + [0, 1]
+            matrix = base.get_matrix(8, values)
+            for row, value in zip(matrix, values):
+                for col, function in enumerate(base(8)):
+                    self.assertAlmostEqual(row[col], function(value))
+
+    def test_sample_matrix(self):
+        base = BSplineBase(3)
+        self.assertIs(base.get_sample_matrix(6, 20), BSplineBase(3).get_sample_matrix(6, 20))
+        self.assertTrue(np.allclose(base.get_sample_matrix(6, 20).sum(axis=1), 1))
+
+    def test_sample_matrix_subclass(self):
+        class UniformBase(BSplineBase):
+            def make_knot_vector(self, degree, num_points):
+                return list(np.linspace(0, 1, num_points + degree + 1))
+
+        matrix = BSplineBase(3).get_sample_matrix(6, 20)
+        other = UniformBase(3).get_sample_matrix(6, 20)
+        self.assertIsNot(matrix, other)
+        self.assertFalse(np.allclose(matrix, other))
+
+    def test_sample_matrix_bounded(self):
+        base = BSplineBase(3)
+        for num_samples in range(2, 2 + 2 * base.matrices.maxsize):
+            base.get_sample_matrix(6, num_samples)
+        self.assertEqual(len(base.matrices), base.matrices.maxsize)
+        clear_cache()
+        self.assertEqual(len(base.matrices), 0)
+
+    def test_derivative_matrix(self):
+        values = np.linspace(0.01, 0.99, 14)  # not on the knots
+        step = 1e-6
+        for degree in range(1, 4):
+            base = BSplineBase(degree)
+            difference = base.get_matrix(7, values + step) - base.get_matrix(7, values - step)
+            derivative = base.get_derivative_matrix(7, values)
+            self.assertTrue(np.allclose(derivative, difference / (2 * step), atol=1e-4))
+
+    def test_length(self):
+        spline = BSpline3([[i, random.random()] for i in range(6)])
+        self.assertAlmostEqual(spline.get_length(), spline.get_length(100000), 4)
+
+    def test_sequence(self):
+        spline = BSpline3([[i, random.random()] for i in range(6)])
+        sequence = spline.get_sequence(20)
+        for value, point in zip(np.linspace(0, 1, 20), sequence):
+            self.assertAlmostEqual(spline(value)[1], point[1])
+
+
 
 if __name__ == '__main__':
     unittest.main(verbosity=2)
\ No newline at end of file
@@ -0,0 +1,349 @@
+import copy
+import os
+import pickle
+import tempfile
+import unittest
+
+import numpy as np
+
+from common import openglider
+from openglider.utils.cache import (
+    CachedObject,
+    HashedList,
+    LRUCache,
+    cache_budget,
+    cache_statistics,
+    cached_function,
+    cached_property,
+    clear_cache,
+    get_version,
+)
+from openglider.utils.disk_cache import DiskCache, content_hash, disk_cached
+from openglider.vector import PolyLine2D
+from openglider.vector.spline.bezier import BernsteinBase
+
+
+class Dummy(CachedObject):
+    hashlist = ("value", "line")
+
+    def __init__(self, value, line):
+        self.value = value
+        self.line = line
+        self.calls = 0
+
+    @cached_property("value", "line")
+    def result(self):
+        # bypass the version tracking for the call counter
+        self.__dict__["calls"] += 1
+        return self.value * self.line.data.sum()
+
+    @cached_function("self")
+    def scaled(self, factor):
+        self.__dict__["calls"] += 1
+        return self.value * factor
+
+    @cached_function("self")
+    def shifted(self, offset=1, scale=1.0):
+        self.__dict__["calls"] += 1
+        return self.value * scale + offset
+
+
+class Vector(CachedObject):
+    def __init__(self, vec):
+        self.vec = np.array(vec)
+        self.calls = 0
+
+    @cached_property("vec")
+    def length(self):
+        self.__dict__["calls"] += 1
+        return np.linalg.norm(self.vec)
+
+
+class Bounded(CachedObject):
+    @cached_function("self", maxsize=3)
+    def array(self, num):
+        return np.zeros(num)
+
+    @cached_function("self", max_bytes=1000)
+    def big_array(self, num):
+        return np.zeros(num)
+
+
+class TestVersionCache(unittest.TestCase):
+    def setUp(self):
+        self.line = HashedList([[0.0, 1.0], [2.0, 3.0]])
+        self.obj = Dummy(2, self.line)
+
+    def test_cached_property(self):
+        self.assertEqual(self.obj.result, 12)
+        self.assertEqual(self.obj.result, 12)
+        self.assertEqual(self.obj.calls, 1)
+
+    def test_attribute_change(self):
+        self.assertEqual(self.obj.result, 12)
+        self.obj.value = 3
+        self.assertEqual(self.obj.result, 18)
+        self.assertEqual(self.obj.calls, 2)
+
+    def test_data_change(self):
+        self.assertEqual(self.obj.result, 12)
+        self.line[0] = [1.0, 1.0]
+        self.assertEqual(self.obj.result, 14)
+        self.line.data = np.zeros((2, 2))
+        self.assertEqual(self.obj.result, 0)
+        self.assertEqual(self.obj.calls, 3)
+
+    def test_version_stamps(self):
+        version = get_version(self.line)
+        self.line.name = "renamed"
+        self.assertEqual(version, get_version(self.line))
+        self.line.data = self.line.data
+        self.assertNotEqual(version, get_version(self.line))
+
+        obj_version = get_version(self.obj)
+        self.line.data = self.line.data
+        self.assertNotEqual(obj_version, get_version(self.obj))
+
+    def test_hash(self):
+        data = np.zeros((2000, 2))
+        other = data.copy()
+        other[1000] = [1.0, 1.0]  # hidden in str(data)
+        self.assertEqual(hash(HashedList(data)), hash(HashedList(data.copy())))
+        self.assertNotEqual(hash(HashedList(data)), hash(HashedList(other)))
+
+    def test_copy(self):
+        data = np.zeros((3, 2))
+        self.assertIsNot(HashedList(data).data, data)
+        line = HashedList(data, copy=False)
+        self.assertIs(line.data, data)
+        line.set_data(np.ones((3, 2)), copy=False)
+        self.assertEqual(line.data.sum(), 6)
+
+    def test_array_attribute(self):
+        vector = Vector([3.0, 4.0])
+        self.assertEqual(vector.length, 5)
+        self.assertEqual(vector.length, 5)
+        self.assertEqual(vector.calls, 1)
+        # augmented assignments renew the version
+        vector.vec *= 2
+        self.assertEqual(vector.length, 10)
+        self.assertEqual(vector.calls, 2)
+        # arrays are keyed by identity, not by content
+        self.assertEqual(vector._get_version(), vector._get_version())
+        vector.__dict__["vec"] = vector.vec.copy()
+        self.assertEqual(vector.length, 10)
+        self.assertEqual(vector.calls, 3)
+
+    def test_pickle(self):
+        self.obj.result
+        self.obj.scaled(2)
+        state = pickle.dumps(self.obj)
+        self.assertNotIn("_cache", self.obj.__getstate__())
+        self.assertNotIn("cached_functions", self.obj.__getstate__())
+
+        other = pickle.loads(state)
+        self.assertNotEqual(other._version, self.obj._version)
+        self.assertEqual(other.result, self.obj.result)
+        self.assertEqual(other.scaled(2), 4)
+        self.assertEqual(other.calls, self.obj.calls + 2)
+
+        copied = copy.deepcopy(self.obj)
+        self.assertNotEqual(copied._version, self.obj._version)
+        self.assertNotIn("_cache", copied.__dict__)
+
+    def test_cached_function(self):
+        self.assertEqual(self.obj.scaled(2), 4)
+        self.assertEqual(self.obj.scaled(2), 4)
+        self.assertEqual(self.obj.scaled(factor=3), 6)
+        self.assertEqual(self.obj.calls, 2)
+        self.obj.value = 1
+        self.assertEqual(self.obj.scaled(2), 2)
+        self.assertEqual(self.obj.calls, 3)
+
+    def test_cached_function_arguments(self):
+        # positional, keyword and default arguments share the cache-entries
+        self.assertEqual(self.obj.shifted(), 3)
+        self.assertEqual(self.obj.shifted(1), 3)
+        self.assertEqual(self.obj.shifted(offset=1), 3)
+        self.assertEqual(self.obj.shifted(1, 1.0), 3)
+        self.assertEqual(self.obj.shifted(scale=1.0, offset=1), 3)
+        self.assertEqual(self.obj.calls, 1)
+        self.assertEqual(self.obj.shifted(2), 4)
+        self.assertEqual(self.obj.shifted(offset=2, scale=1.0), 4)
+        self.assertEqual(self.obj.calls, 2)
+
+        self.obj.shifted.set(10, 5)
+        self.assertEqual(self.obj.shifted(offset=5), 10)
+
+    def test_clear_cache(self):
+        self.obj.result
+        clear_cache()
+        self.obj.result
+        self.assertEqual(self.obj.calls, 2)
+
+
+class Stored(object):
+    def __init__(self, line):
+        self.line = line
+        self.calls = 0
+
+    @disk_cached("line")
+    def flat(self, scale=1):
+        self.calls += 1
+        return {"lines": [PolyLine2D(self.line.data * scale)], "scale": scale}
+
+    @disk_cached("line")
+    def nothing(self):
+        self.calls += 1
+        return None
+
+
+class TestBoundedCache(unittest.TestCase):
+    def setUp(self):
+        self.obj = Bounded()
+        self.config = openglider.config.__dict__.copy()
+
+    def tearDown(self):
+        openglider.config.update(self.config)
+
+    def test_maxsize(self):
+        for i in range(10):
+            self.obj.array(i)
+        self.assertEqual(len(self.obj.array), 3)
+
+    def test_lru(self):
+        first = self.obj.array(1)
+        self.obj.array(2)
+        self.obj.array(1)
+        self.obj.array(3)
+        self.obj.array(4)
+        self.assertIs(self.obj.array(1), first)
+
+    def test_max_bytes(self):
+        for i in range(10):
+            self.obj.big_array(50)
+            self.obj.big_array(51 + i)
+        self.assertLessEqual(self.obj.big_array.nbytes, 1000)
+
+    def test_global_limit(self):
+        openglider.config.update({"cache_max_entries": 5})
+        objs = [Bounded() for _ in range(4)]
+        for obj in objs:
+            obj.array(1)
+            obj.array(2)
+        self.assertLessEqual(len(cache_budget), 5)
+        self.assertEqual(sum(len(obj.array) for obj in objs), len(cache_budget))
+
+    def test_global_limit_properties(self):
+        openglider.config.update({"cache_max_entries": 3})
+        objs = [Vector([i, 1, 0]) for i in range(5)]
+        for obj in objs:
+            obj.length
+        self.assertLessEqual(len(cache_budget), 3)
+
+        objs[-1].length
+        self.assertEqual(objs[-1].calls, 1)
+        # evicted properties are recomputed
+        self.assertAlmostEqual(objs[0].length, 1)
+        self.assertEqual(objs[0].calls, 2)
+
+    def test_lru_cache(self):
+        cache = LRUCache(maxsize=2)
+        cache[1] = "a"
+        cache[2] = "b"
+        self.assertEqual(cache[1], "a")
+        cache[3] = "c"
+        self.assertEqual(len(cache), 2)
+        self.assertIn(1, cache)
+        self.assertNotIn(2, cache)
+        clear_cache()
+        self.assertEqual(len(cache), 0)
+
+    def test_sample_matrices(self):
+        base = BernsteinBase
+        for num_samples in range(2, 2 + 2 * base.matrices.maxsize):
+            base.get_sample_matrix(3, num_samples)
+        self.assertEqual(len(base.matrices), base.matrices.maxsize)
+        clear_cache()
+        self.assertEqual(len(base.matrices), 0)
+
+
+class TestCacheStatistics(unittest.TestCase):
+    def test_statistics(self):
+        obj = Dummy(2, HashedList([[0.0, 1.0]]))
+        with cache_statistics() as stats:
+            obj.result
+            obj.result
+            obj.scaled(1)
+
+        obj.result
+
+        report = stats.get_report()
+        result = report[f"{Dummy.__module__}.Dummy.result"]
+        self.assertEqual(result["hits"], 1)
+        self.assertEqual(result["misses"], 1)
+        self.assertEqual(sum(r["misses"] for r in report.values()), 2)
+
+
+class TestDiskCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.config = openglider.config.__dict__.copy()
+        openglider.config.update({"disk_cache_path": self.tmp_dir.name})
+
+    def tearDown(self):
+        openglider.config.update(self.config)
+        self.tmp_dir.cleanup()
+
+    def test_content_hash(self):
+        data = np.arange(6.0).reshape((3, 2))
+        key = content_hash(HashedList(data), 10)
+        self.assertEqual(key, content_hash(HashedList(data.copy()), 10))
+        self.assertNotEqual(key, content_hash(HashedList(data), 11))
+        self.assertNotEqual(key, content_hash(HashedList(data.reshape((2, 3))), 10))
+
+    def test_roundtrip(self):
+        cache = DiskCache(os.path.join(self.tmp_dir.name, "roundtrip"))
+        value = {"array": np.arange(4.0), "items": [1, "a", (2.5, None)]}
+        cache.set("key", value)
+        result = cache.get("key")
+        self.assertNotIsInstance(result["array"], np.memmap)
+        self.assertTrue(result["array"].flags.writeable)
+        self.assertTrue(np.array_equal(result["array"], value["array"]))
+        self.assertEqual(result["items"], value["items"])
+        self.assertIsNone(cache.get("missing"))
+
+    def test_disk_cached(self):
+        line = HashedList([[0.0, 0.0], [1.0, 2.0]])
+        first = Stored(line)
+        cold = first.flat()
+        # a new instance (or process) with equal inputs reuses the stored result
+        second = Stored(HashedList(line.data.copy()))
+        result = second.flat(scale=1)
+        self.assertEqual(second.calls, 0)
+        self.assertIsInstance(result["lines"][0], PolyLine2D)
+        self.assertTrue(np.array_equal(result["lines"][0].data, line.data))
+        # hits and misses return the same kind of arrays
+        self.assertIs(type(result["lines"][0].data), type(cold["lines"][0].data))
+        self.assertTrue(result["lines"][0].data.flags.writeable)
+
+        second.flat(2)
+        self.assertEqual(second.calls, 1)
+
+    def test_disk_cached_none(self):
+        stored = Stored(HashedList([[0.0, 0.0], [1.0, 2.0]]))
+        self.assertIsNone(stored.nothing())
+        self.assertIsNone(stored.nothing())
+        self.assertEqual(stored.calls, 1)
+
+    def test_size_limit(self):
+        cache = DiskCache(os.path.join(self.tmp_dir.name, "limit"), max_bytes=3000)
+        for i in range(5):
+            cache.set(str(i), np.zeros(100))
+        self.assertLessEqual(cache.nbytes, 3000)
+        self.assertIn("4", cache)
+        self.assertNotIn("0", cache)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
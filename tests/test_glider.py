@@ -17,11 +17,17 @@
 #
 # You should have received a copy of the GNU General Public License
 # along with OpenGlider.  If not, see <http://www.gnu.org/licenses/>.
+import pickle
 import random
 import unittest
 
+import numpy as np
+
 from common import *
 import openglider.glider
+from openglider.glider.cell import parallel
+from openglider.glider.cell.elements import Panel
+from openglider.glider.rib import MiniRib
 
 
 class GliderTestClass(TestCase):
@@ -67,6 +73,116 @@ class TestGlider(GliderTestClass):
     def copy_complete(self):
         self.glider.copy_complete()
 
+    def test_midribs(self):
+        y_values = [0, 0.2, 0.37, 0.5, 1]
+        for cell in self.glider.cells:
+            midribs = cell.midribs(y_values)
+            self.assertEqual(midribs.shape, (len(y_values), len(cell.prof1.data), 3))
+            for y, midrib in zip(y_values, midribs):
+                self.assertTrue(np.allclose(midrib, cell.midrib(y).data))
+            # cached per set of y-values
+            self.assertIs(cell.basic_cell.midribs(y_values), cell.basic_cell.midribs(y_values))
+
+    def test_midrib_copy(self):
+        basic_cell = self.glider.cells[0].basic_cell
+        midrib = basic_cell.midrib(0.3)
+        expected = midrib.data.copy()
+        midrib.data[:] = 0
+        self.assertTrue(np.array_equal(basic_cell.midrib(0.3).data, expected))
+        with self.assertRaises(ValueError):
+            basic_cell.midribs([0.3])[0, 0] = 0
+
+    def test_midrib_uncached(self):
+        basic_cell = self.glider.cells[0].basic_cell
+        midribs = basic_cell.midribs([0.2, 0.5])
+        for y in np.linspace(0.01, 0.99, 40):
+            basic_cell.midrib(y)
+        self.assertIs(basic_cell.midribs([0.2, 0.5]), midribs)
+
+    def test_midribs_miniribs(self):
+        cell = self.glider.cells[len(self.glider.cells) // 2]
+        cell.miniribs.append(MiniRib(0.5, 0.7))
+        self.assertEqual(len(cell._child_cells), 2)
+        y_values = np.linspace(0, 1, 9)
+        for y, midrib in zip(y_values, cell.midribs(y_values)):
+            self.assertTrue(np.allclose(midrib, cell.midrib(y).data))
+
+    def test_flattened_cell(self):
+        cell = self.glider.cells[len(self.glider.cells) // 2]
+        numribs = 10
+        flat = cell.get_flattened_cell(numribs)
+        left, right = [line.data for line in flat["ballooned"]]
+        self.assertEqual(len(flat["inner"]), numribs + 2)
+        self.assertTrue(np.allclose(flat["inner"][0].data, left))
+        self.assertTrue(np.allclose(flat["inner"][-1].data, right))
+
+        # rib-lengths and spanwise lengths are preserved
+        rib_segments = np.linalg.norm(np.diff(cell.prof1.data, axis=0), axis=1)
+        flat_segments = np.linalg.norm(np.diff(left, axis=0), axis=1)
+        self.assertTrue(np.allclose(rib_segments, flat_segments))
+
+        midribs = cell.midribs(np.linspace(0, 1, numribs))
+        spanwise = np.linalg.norm(np.diff(midribs, axis=0), axis=2).sum(axis=0)
+        self.assertTrue(np.allclose(spanwise, np.linalg.norm(right - left, axis=1)))
+
+    def test_3d_shaping(self):
+        numribs = 5
+        self.glider.calculate_3d_shaping(numribs)
+        for cell in self.glider.cells:
+            amounts = [panel.cut_front["amount_3d"] for panel in cell.panels]
+            for amount in amounts:
+                self.assertEqual(len(amount), numribs + 2)
+            cell.calculate_3d_shaping(numribs=numribs)
+            for amount, panel in zip(amounts, cell.panels):
+                self.assertTrue(np.allclose(amount, panel.cut_front["amount_3d"]))
+
+    def test_parallel_3d_shaping(self):
+        numribs = 5
+
+        def get_amounts(glider):
+            return [
+                panel.cut_front["amount_3d"] + panel.cut_back["amount_3d"]
+                for cell in glider.cells
+                for panel in cell.panels
+            ]
+
+        self.glider.calculate_3d_shaping(numribs, workers=1)
+        serial = get_amounts(self.glider)
+        flat = [cell.get_flattened_cell(numribs)["inner"] for cell in self.glider.cells]
+
+        glider = self.import_glider()
+        glider.calculate_3d_shaping(numribs, workers=2)
+        self.assertTrue(np.allclose(np.concatenate(serial), np.concatenate(get_amounts(glider))))
+        for inner, cell in zip(flat, glider.cells):
+            inner_parallel = cell.get_flattened_cell(numribs)["inner"]
+            for line, line_parallel in zip(inner, inner_parallel):
+                self.assertTrue(np.allclose(line.data, line_parallel.data))
+
+    def test_cell_data(self):
+        cell = self.glider.cells[len(self.glider.cells) // 2]
+        cell.miniribs.append(MiniRib(0.5, 0.7))
+        data = pickle.loads(pickle.dumps(parallel.CellData(cell)))
+        y_values = np.linspace(0, 1, 7)
+        self.assertTrue(np.allclose(data.midribs(y_values), cell.midribs(y_values)))
+
+        result = parallel.process_cell(data, 4)
+        self.assertEqual(result["inner"].shape[0], 6)
+        self.assertEqual(len(result["amounts"]), len(cell.panels))
+
+    def test_integrate_3d_shaping_batch(self):
+        jobs = []
+        for cell in self.glider.cells:
+            inner = cell.get_flattened_cell(4)["inner"]
+            jobs += [(panel, cell, cell.sigma_3d_cut, inner) for panel in cell.panels]
+
+        for job, (front, back) in zip(jobs, Panel.integrate_3d_shaping_batch(jobs)):
+            panel, cell, sigma, inner = job
+            front_single, back_single = panel.integrate_3d_shaping(cell, sigma, inner)
+            self.assertTrue(np.allclose(front, front_single))
+            self.assertTrue(np.allclose(back, back_single))
+            self.assertEqual(front[0], 0)
+            self.assertEqual(back[-1], 0)
+
     def test_mean_rib(self):
         for cell in self.glider.cells:
             cell.mean_rib(10)
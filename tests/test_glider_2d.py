@@ -1,5 +1,7 @@
 import unittest
 
+import numpy as np
+
 import tempfile
 import os
 from common import *
@@ -20,6 +22,23 @@ class GliderTestCase2D(TestCase):
         glider = self.glider2d.get_glider_3d()
         self.assertAlmostEqual(glider.span, 2*self.glider2d.shape.span, 2)
 
+    def test_merge_cache(self):
+        first = self.glider2d.get_merge_profile(0.5)
+        second = self.glider2d.get_merge_profile(0.5)
+        self.assertIsNot(first, second)
+        self.assertTrue(np.array_equal(first.data, second.data))
+        self.assertEqual(len(self.glider2d._merge_profile), 1)
+
+        self.glider2d.merge_tolerance = 0.1
+        self.glider2d.merge_ballooning(0.51)
+        self.glider2d.merge_ballooning(0.49)
+        self.assertEqual(len(self.glider2d._merge_ballooning), 1)
+
+        ballooning = self.glider2d.balloonings[0]
+        ballooning.scale(2)
+        self.glider2d.merge_ballooning(0.5)
+        self.assertEqual(len(self.glider2d._merge_ballooning), 1)
+
     def test_export(self):
         exp = jsonify.dumps(self.glider2d)
         imp = jsonify.loads(exp)['data']
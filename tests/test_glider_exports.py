@@ -23,6 +23,7 @@ import json
 from common import *
 from openglider.plots import PlotMaker
 from openglider import jsonify
+from openglider.glider.in_out import export_3d
 from test_glider import GliderTestClass
 
 
@@ -44,6 +45,15 @@ class TestGlider(TestCase):
         path = self.tempfile('kite.obj')
         self.glider.export_3d(path, midribs=5)
 
+    def test_export_obj_hull(self):
+        path = self.tempfile('kite_hull.obj')
+        export_3d.export_obj_hull(self.glider, path, midribs=2, copy=False)
+        vertices, quads, _ = self.glider.get_hull_arrays(2)
+        with open(path) as infile:
+            lines = infile.read().splitlines()
+        self.assertEqual(sum(line.startswith("v ") for line in lines), len(vertices))
+        self.assertEqual(sum(line.startswith("f ") for line in lines), len(quads))
+
     @unittest.skip('this hangs')
     def test_export_dxf(self):
         path = self.tempfile('kite.dxf')
@@ -1,9 +1,10 @@
 import unittest
 
+import numpy as np
 
 from common import *
 
-from openglider.mesh import Mesh, Vertex, Polygon
+from openglider.mesh import Mesh, Vertex, Polygon, grid_quads
 import openglider
 from openglider.utils.distribution import Distribution
 
@@ -28,6 +29,37 @@ class TestMesh(TestCase):
             matches = [vertex.is_equal(p) for p in m3.vertices]
             self.assertTrue(any(matches))
 
+    def test_grid_quads(self):
+        quads = grid_quads(3, 4)
+        self.assertEqual(quads.shape, (6, 4))
+        self.assertEqual(quads[0].tolist(), [0, 1, 5, 4])
+        self.assertEqual(quads[-1].tolist(), [6, 7, 11, 10])
+
+        closed = grid_quads(2, 3, closed=True, row_length=4)
+        self.assertEqual(closed.tolist(), [[0, 1, 5, 4], [1, 2, 6, 5], [2, 0, 4, 6]])
+
+    def test_hull_arrays(self):
+        vertices, quads, boundary = self.glider.get_hull_arrays(2)
+        surface = self.glider.get_surface_array(2)
+        self.assertEqual(surface.shape[0], len(self.glider.cells) * 3 + 1)
+        self.assertTrue(np.array_equal(vertices, surface.reshape(-1, 3)))
+        self.assertLess(quads.max(), len(vertices))
+        self.assertEqual(len(boundary["trailing_edge"]), len(surface) - 1)
+
+        mesh = self.glider.get_mesh_hull(2)
+        self.assertEqual(len(mesh.polygons["hull"]), len(quads))
+
+        # array input gives the same mesh as plain lists
+        mesh_list = Mesh.from_indexed(vertices.tolist(), {"hull": quads.tolist()}, {
+            name: list(nodes) for name, nodes in boundary.items()
+        })
+        for poly, poly_list in zip(mesh.polygons["hull"], mesh_list.polygons["hull"]):
+            self.assertEqual([list(node) for node in poly], [list(node) for node in poly_list])
+        self.assertEqual(
+            [list(node) for node in mesh.boundary_nodes["trailing_edge"]],
+            [list(node) for node in mesh_list.boundary_nodes["trailing_edge"]]
+        )
+
     def test_glider_mesh(self):
         dist = Distribution.from_nose_cos_distribution(30, 0.2)
         dist.add_glider_fixed_nodes(self.glider)
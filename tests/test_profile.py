@@ -22,7 +22,7 @@ import os
 import tempfile
 import unittest
 from common import import_dir
-from openglider.airfoil import Profile2D
+from openglider.airfoil import AirfoilLibrary, Profile2D, Profile3D
 from test_vector import *
 
 TEMPDIR =  tempfile.gettempdir()
@@ -45,6 +45,29 @@ class TestProfile(unittest.TestCase):
         x = random.random() * random.randint(-1, 1)
         self.assertAlmostEqual(abs(x), self.prof.profilepoint(x)[0])
 
+    def test_call_array(self):
+        x_values = np.array([random.random() * 2 - 1 for _ in range(50)] + [0, -1, 1])
+        iks = self.prof(x_values)
+        for x, ik in zip(x_values, iks):
+            self.assertAlmostEqual(self.prof(x), ik)
+        points = self.prof.profilepoint(x_values)
+        self.assertTrue(np.allclose(points[:, 0], np.abs(x_values)))
+
+    def test_move_nearest_point(self):
+        for x in (0.37, -0.52):
+            point = self.prof.profilepoint(x)
+            self.prof.move_nearest_point(x)
+            ik = self.prof(x)
+            self.assertAlmostEqual(ik, round(ik))
+            self.assertTrue(np.allclose(self.prof.profilepoint(x), point))
+            self.assertTrue(np.allclose(self.prof.data[int(round(ik))], point))
+
+    def test_align_array(self):
+        points = np.array([[random.random(), random.random() * 2 - 1] for _ in range(20)])
+        aligned = self.prof.align(points)
+        for point, result in zip(points, aligned):
+            self.assertTrue(np.allclose(self.prof.align(point), result))
+
     def test_multiplication(self):
         factor = random.random()
         other = self.prof * factor
@@ -64,11 +87,39 @@ class TestProfile(unittest.TestCase):
         prof = Profile2D.compute_naca(naca=m+p+thickness, numpoints=numpoints)
         self.assertAlmostEqual(prof.thickness*100, thickness, 0)
 
+    def test_compute_naca_array(self):
+        numpoints = random.randint(10, 200)
+        thickness = np.arange(8, 21)
+        data = Profile2D.compute_naca_array(2400 + thickness, numpoints)
+        self.assertEqual(data.shape, (len(thickness), 2 * numpoints - 1, 2))
+        for t, airfoil in zip(thickness, data):
+            prof = Profile2D.compute_naca(2400 + t, numpoints)
+            self.assertTrue(np.allclose(prof.data, airfoil))
+
+    def test_compute_joukowsky(self):
+        prof = Profile2D.compute_joukowsky(numpoints=50)
+        self.assertAlmostEqual(prof.data[prof.noseindex][0], 0)
+        self.assertAlmostEqual(prof.data[0][0], 1)
+
     def test_add(self):
         other = self.prof.copy()
         other = self.prof + other
         self.assertAlmostEqual(2*self.prof.thickness, other.thickness)
 
+    def test_mix(self):
+        other = Profile2D.compute_naca(naca=4412, numpoints=80)
+        factor = random.random()
+        mixed = self.prof.mix(other, factor)
+        for i in range(1, len(self.prof) - 1):
+            x, y = self.prof.data[i]
+            if i <= self.prof.noseindex:
+                x = -x
+            y_other = other.profilepoint(x)[1]
+            self.assertAlmostEqual(mixed.data[i][1], (1 - factor) * y + factor * y_other)
+
+        summed = self.prof * (1 - factor) + other * factor
+        self.assertTrue(np.allclose(mixed.data, summed.data))
+
     def test_mul(self):
         self.prof *= 0
 
@@ -106,5 +157,69 @@ class TestProfile(unittest.TestCase):
         print("len2: ", len(self.prof.data), len(self.prof._rootprof.data))
 
 
+class TestProfile3D(unittest.TestCase):
+    def setUp(self):
+        self.prof = Profile2D.compute_naca(naca=2412, numpoints=60)
+        x, y = self.prof.data.T
+        # rib in the x-z plane, rotated about the x-axis
+        angle = random.random()
+        self.prof3d = Profile3D(np.stack([x, -np.sin(angle) * y, np.cos(angle) * y], axis=1))
+
+    def test_noseindex(self):
+        self.assertEqual(self.prof3d.noseindex, self.prof.noseindex)
+
+    def test_flatten(self):
+        flat = self.prof3d.flatten()
+        # the projection keeps distances within the (planar) rib
+        for i in (0, self.prof.noseindex):
+            distances = np.linalg.norm(flat.data - flat.data[i], axis=1)
+            distances_2d = np.linalg.norm(self.prof.data - self.prof.data[i], axis=1)
+            self.assertTrue(np.allclose(distances, distances_2d))
+
+    def test_normvectors(self):
+        normvectors = self.prof3d.normvectors
+        tangents = self.prof3d.tangents
+        self.assertEqual(normvectors.shape, (len(self.prof3d), 3))
+        self.assertTrue(np.allclose(np.linalg.norm(normvectors, axis=1), 1))
+        self.assertTrue(np.allclose(np.sum(normvectors * tangents, axis=1), 0))
+        self.assertTrue(np.allclose(normvectors.dot(self.prof3d.projection_layer.normvector), 0))
+
+
+class TestAirfoilLibrary(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.dat_dir = os.path.join(self.tmp_dir.name, "dat")
+        os.makedirs(self.dat_dir)
+        for thickness in (10, 12, 15, 18):
+            prof = Profile2D.compute_naca(2400 + thickness, numpoints=40)
+            prof.export_dat(os.path.join(self.dat_dir, "naca24{}.dat".format(thickness)))
+        path = os.path.join(self.tmp_dir.name, "library")
+        AirfoilLibrary.from_dat_directory(path, self.dat_dir)
+        self.library = AirfoilLibrary(path)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_lookup(self):
+        self.assertEqual(len(self.library), 4)
+        self.assertIn("naca2415", self.library)
+        prof = self.library["naca2415"]
+        dat = Profile2D.import_from_dat(os.path.join(self.dat_dir, "naca2415.dat"))
+        self.assertTrue(np.allclose(prof.data, dat.data))
+        self.assertEqual(prof.noseindex, dat.noseindex)
+        self.assertIsInstance(prof.data.base, np.memmap)
+
+    def test_find(self):
+        self.assertEqual(self.library.find(thickness=(0.14, 0.16)), ["naca2415"])
+        self.assertEqual(len(self.library.find(thickness=(0.11, 0.2), camber=(0.019, 0.021))), 3)
+
+    def test_degenerate_profile(self):
+        path = os.path.join(self.tmp_dir.name, "degenerate")
+        with self.assertLogs("openglider.airfoil.library", "WARNING"):
+            library = AirfoilLibrary.build(path, {"line": Profile2D([[1, 0], [0, 0]])})
+        self.assertEqual(len(library), 1)
+        self.assertEqual(library.find(thickness=(0, 1)), [])
+
+
 if __name__ == '__main__':
     unittest.main(verbosity=2)
@@ -20,6 +20,8 @@
 import numpy as np
 from openglider.vector.functions import norm, normalize, rotation_3d
 from openglider.vector.polyline import PolyLine, PolyLine2D
+from openglider.vector.interpolate import Interpolation
+from openglider.vector.polygon import Polygon2D
 
 
 __author__ = 'simon'
@@ -93,6 +95,32 @@ class TestVector3D(unittest.TestCase):
                                    "\nresult: i2=" + str(new) + " leng2=" + str(leng2) +
                                    " dist=" + str(norm(thalist[start] - thalist[new])))
 
+    def test_walk_batch(self):
+        for thalist in self.vectors:
+            starts = [random.random() * self.numpoints for _ in range(10)]
+            lengths = [random.random() * 100 - 50 for _ in range(10)]
+            iks = thalist.walk(np.array(starts), np.array(lengths))
+            for start, leng, ik in zip(starts, lengths, iks):
+                self.assertAlmostEqual(ik, thalist.walk(start, leng))
+            lengths_batch = thalist.get_length(np.array(starts), iks)
+            for leng, leng2 in zip(lengths, lengths_batch):
+                self.assertAlmostEqual(abs(leng), leng2)
+
+    def test_getitem_array(self):
+        for thalist in self.vectors:
+            iks = [random.random() * 120 - 10 for _ in range(10)]
+            points = thalist[np.array(iks)]
+            self.assertEqual(points.shape, (10, len(thalist[0])))
+            for ik, point in zip(iks, points):
+                self.assertTrue(np.allclose(point, thalist[ik]))
+
+    def test_resample(self):
+        for thalist in self.vectors:
+            resampled = thalist.resample(20)
+            self.assertEqual(len(resampled), 20)
+            segments = resampled.get_segment_lengthes()
+            self.assertTrue(np.all(segments <= thalist.get_length() / 19 + 1e-7))
+
 
 class TestVector2D(TestVector3D):
     def setUp(self, dim=2):
@@ -116,6 +144,46 @@ class TestVector2D(TestVector3D):
             amount = random.random()
             thalist.add_stuff(amount)
 
+    def test_shift_distance(self):
+        line = PolyLine2D([[0, 0], [1, 0], [2, 1], [3, 1]])
+        shifted = line.copy().add_stuff(0.1)
+        self.assertEqual(len(shifted), len(line))
+        for point, normal, shifted_point in zip(line, line.normvectors, shifted):
+            self.assertGreater((shifted_point - point).dot(normal), 0)
+        self.assertAlmostEqual(norm(shifted[0] - line[0]), 0.1)
+
+    def test_close_length(self):
+        polygon = Polygon2D([[0.5, -0.5], [0, 0], [1, 0], [1, 1], [0, 1], [0, 0.5]])
+        self.assertAlmostEqual(polygon.get_length(), 3.5 + np.sqrt(0.5))
+        self.assertTrue(polygon.close())
+        self.assertAlmostEqual(polygon.get_length(), 4)
+
+    def test_check_duplicates(self):
+        line = PolyLine2D([[0, 0], [1, 1], [1, 1], [2, 2], [2, 2]])
+        line.check()
+        self.assertEqual(len(line), 3)
+
+    def test_check_loop(self):
+        # the segments 0 and 3 cut each other at [1, 0]
+        line = PolyLine2D([[0, 0], [2, 0], [2, 1], [1, 1], [1, -1], [0, -2], [-1, -2]])
+        line.check()
+        self.assertEqual(len(line), 4)
+        self.assertTrue(np.allclose(line[0], [1, 0]))
+
+    def test_check_multiple_loops(self):
+        # loops: segment 0 is cut by segment 3 at [1, 0], segment 5 by segment 8 at [4, -1]
+        # and the rest of segment 8 by segment 11 at [4, -3].
+        # the start of a cut segment is replaced by the cut-point
+        line = PolyLine2D([
+            [0, 0], [2, 0], [2, 1], [1, 1], [1, -1], [3, -1], [5, -1],
+            [5, 0], [4, 0], [4, -4], [5, -4], [5, -3], [3, -3], [3, -5], [6, -5]
+        ])
+        line.check()
+        expected = [[1, 0], [1, -1], [4, -3], [3, -3], [3, -5], [6, -5]]
+        self.assertEqual(len(line), len(expected))
+        self.assertTrue(np.allclose(line.data, expected))
+        self.assertEqual(line._get_self_cut_candidates(line.data), {})
+
     def test_Cut(self):
         for thalist in self.vectors:
             i = random.randint(1, len(thalist)-3)
@@ -129,6 +197,43 @@ class TestVector2D(TestVector3D):
             neu = thalist.cut(p1, p2, i - 1)
             #self.assertAlmostEqual(i, neu[1])
 
+    def test_intersections(self):
+        for thalist in self.vectors:
+            x = random.random() * 100
+            p1, p2 = [x, -1000], [x, 1000]
+            cuts = sorted(ik for ik, _ in thalist.cut(p1, p2))
+            ik_self, ik_other = thalist.get_intersections(PolyLine2D([p1, p2]))
+            self.assertEqual(len(cuts), len(ik_self))
+            for ik, ik2 in zip(cuts, ik_self):
+                self.assertAlmostEqual(ik, ik2)
+            self.assertTrue(np.allclose(thalist[ik_self][:, 0], x))
+
+    def test_segment_index(self):
+        for thalist in self.vectors:
+            index = thalist.segment_index
+            for _ in range(10):
+                p1 = np.array([random.random() * 100, random.random() * 100])
+                p2 = p1 + [random.random() - 0.5, random.random() - 0.5]
+                candidates = thalist.get_cut_candidates(p1, p2)
+                self.assertTrue(set(candidates) <= set(index.query_line(p1, p2)))
+
+    def test_cut_with_polyline(self):
+        for thalist in self.vectors[:10]:
+            other = PolyLine2D([[random.random() * 100, random.random() * 100] for _ in range(20)])
+            cuts = []
+            for i in range(len(other) - 1):
+                p1, p2 = other[i], other[i + 1]
+                for ik, k in thalist.cut(p1, p2):
+                    if 0 <= k < 1:
+                        cuts.append((ik, i + k))
+            result = list(thalist.cut_with_polyline(other))
+            self.assertEqual(len(result), len(cuts))
+            for (ik1, ik2), (ik1_, ik2_) in zip(sorted(result), sorted(cuts)):
+                self.assertAlmostEqual(ik1, ik1_)
+                self.assertAlmostEqual(ik2, ik2_)
+            ik_self, _ = thalist.get_intersections(other)
+            self.assertEqual(len(ik_self), len(cuts))
+
 class TestVectorFunctions3D(unittest.TestCase):
     def setUp(self):
         self.vectors = [
@@ -161,6 +266,36 @@ class TestVectorFunctions3D(unittest.TestCase):
                     self.assertAlmostEqual(p1[i], p2[i])
 
 
+class TestInterpolation(unittest.TestCase):
+    def setUp(self):
+        self.interpolation = Interpolation([[0, 0], [1, 2], [2, 0], [4, 1]])
+
+    def test_values(self):
+        self.assertAlmostEqual(self.interpolation(0.5), 1)
+        self.assertAlmostEqual(self.interpolation(1), 2)
+        self.assertAlmostEqual(self.interpolation(3), 0.5)
+
+    def test_extrapolate(self):
+        self.assertAlmostEqual(self.interpolation(-1), -2)
+        self.assertAlmostEqual(self.interpolation(6), 2)
+        self.interpolation.extrapolate = False
+        self.assertRaises(ValueError, self.interpolation, -1)
+        self.assertRaises(ValueError, self.interpolation, 6)
+
+    def test_setitem(self):
+        self.assertAlmostEqual(self.interpolation(1), 2)
+        self.interpolation[1] = [1, 4]
+        self.assertAlmostEqual(self.interpolation(1), 4)
+        self.interpolation.move([1, 0])
+        self.assertAlmostEqual(self.interpolation(2), 4)
+
+    def test_array(self):
+        values = [random.random() * 6 - 1 for _ in range(20)]
+        result = self.interpolation(np.array(values))
+        for x, y in zip(values, result):
+            self.assertAlmostEqual(self.interpolation(x), y)
+
+
 
 
 if __name__ == '__main__':